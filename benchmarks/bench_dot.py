@@ -0,0 +1,24 @@
+"""Benchmark of the generation of the dot source of a large schema.
+
+Run with `python benchmarks/bench_dot.py [n_tables]`.
+"""
+
+from __future__ import annotations
+
+import sys
+
+from common import er_lines, timeit
+
+from eralchemy.main import _intermediary_to_dot
+from eralchemy.parser import line_iterator_to_intermediary
+
+
+def main(n_tables: int = 13_334) -> None:
+    tables, relationships = line_iterator_to_intermediary(er_lines(n_tables))
+    n_columns = sum(len(t.columns) for t in tables)
+    duration = timeit(lambda: _intermediary_to_dot(tables, relationships))
+    print(f"{n_columns:,} columns: {duration:.2f}s, {n_columns / duration:,.0f} columns/s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""Benchmark of the graphviz engines on random schemas, justifying `layout.choose_engine`.
+
+Run with `python benchmarks/bench_engine.py [n_tables n_relations]`.
+"""
+
+from __future__ import annotations
+
+import sys
+
+from common import random_lines, timeit
+
+from eralchemy.layout import choose_engine
+from eralchemy.main import intermediary_to_schema
+from eralchemy.parser import line_iterator_to_intermediary
+
+SIZES = ((300, 450), (1000, 1000), (400, 1200), (2000, 3000))
+
+
+def main(*size: int) -> None:
+    for n_tables, n_relations in [size] if size else SIZES:
+        tables, relationships = line_iterator_to_intermediary(random_lines(n_tables, n_relations))
+        durations = []
+        for engine in ("dot", "sfdp"):
+            duration = timeit(
+                lambda: intermediary_to_schema(
+                    tables, relationships, extension="svg", engine=engine
+                ),
+                1,
+            )
+            durations.append(f"{engine} {duration:.2f}s")
+        print(
+            f"{n_tables} tables, {n_relations} relations: {', '.join(durations)},"
+            f" auto chooses {choose_engine(n_tables, n_relations)}"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,33 @@
+"""Benchmark of the layout of a schema made of many unrelated groups of tables.
+
+Run with `python benchmarks/bench_layout.py [n_islands] [island_size]`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+from common import islands_lines, timeit
+
+from eralchemy.main import intermediary_to_schema
+from eralchemy.parser import line_iterator_to_intermediary
+
+
+def main(n_islands: int = 40, island_size: int = 25) -> None:
+    tables, relationships = line_iterator_to_intermediary(islands_lines(n_islands, island_size))
+    print(f"{n_islands} islands of {island_size} tables, {os.cpu_count()} cores")
+    duration = timeit(lambda: intermediary_to_schema(tables, relationships, extension="svg"), 1)
+    print(f"single layout: {duration:.2f}s")
+    for processes in sorted({1, os.cpu_count() or 1}):
+        duration = timeit(
+            lambda: intermediary_to_schema(
+                tables, relationships, extension="svg", layout_processes=processes
+            ),
+            1,
+        )
+        print(f"packed layout, {processes} processes: {duration:.2f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,28 @@
+"""Benchmark of the memory used by the intermediary representation.
+
+Run with `python benchmarks/bench_memory.py [n_tables]`.
+"""
+
+from __future__ import annotations
+
+import sys
+import tracemalloc
+
+from common import er_lines
+
+from eralchemy.parser import line_iterator_to_intermediary
+
+
+def main(n_tables: int = 10_000) -> None:
+    lines = list(er_lines(n_tables))
+    tracemalloc.start()
+    tables, relationships = line_iterator_to_intermediary(lines)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    n_columns = sum(len(t.columns) for t in tables)
+    print(f"{n_columns:,} columns: {size / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB")
+    print(f"{size / n_columns:.0f} bytes per column")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
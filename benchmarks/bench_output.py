@@ -0,0 +1,41 @@
+"""Benchmark of the memory used to write the text outputs of a large schema.
+
+Run with `python benchmarks/bench_output.py [n_tables]`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tracemalloc
+
+from common import er_lines
+
+from eralchemy.helpers import write_chunks
+from eralchemy.main import get_output_mode, switch_output_emitter
+from eralchemy.parser import line_iterator_to_intermediary
+
+
+def main(n_tables: int = 10_000) -> None:
+    tables, relationships = line_iterator_to_intermediary(er_lines(n_tables))
+    for mode in ("er", "mermaid", "mermaid_er", "dot", "puml"):
+        intermediary_to_output = get_output_mode(None, mode)
+        tracemalloc.start()
+        data = intermediary_to_output(tables, relationships, "")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+        emit = switch_output_emitter[intermediary_to_output]
+        tracemalloc.start()
+        with open(os.devnull, "wb") as sink:
+            write_chunks(emit(tables, relationships, ""), sink)
+        _, streamed_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{mode}: peak {peak / 2**20:.1f} MiB in memory,"
+            f" {streamed_peak / 2**20:.1f} MiB streamed"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
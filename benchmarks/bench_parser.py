@@ -0,0 +1,44 @@
+"""Benchmark of the parsing of a large markdown file.
+
+Run with `python benchmarks/bench_parser.py [n_tables]`.
+"""
+
+from __future__ import annotations
+
+import sys
+
+from common import er_lines, timeit
+
+from eralchemy.models import Drawable
+from eralchemy.parser import (
+    TYPES,
+    filter_lines_from_comments,
+    line_iterator_to_intermediary,
+    parse_line,
+)
+
+
+def parse_line_sequential(line: str) -> Drawable:
+    """Previous implementation of parse_line, trying every regex in order."""
+    for typ in TYPES:
+        match = typ.RE.match(line)
+        if match:
+            return typ.make_from_match(match)
+    raise ValueError(line)
+
+
+def main(n_tables: int = 10_000) -> None:
+    lines = [line for _, line, _ in filter_lines_from_comments(er_lines(n_tables))]
+    for name, func in (("sequential", parse_line_sequential), ("dispatch", parse_line)):
+        duration = timeit(lambda: [func(line) for line in lines])
+        print(f"{name:>12}: {len(lines) / duration:12,.0f} lines/s")
+
+    raw_lines = list(er_lines(n_tables))
+    for processes in (1, None):
+        duration = timeit(lambda: line_iterator_to_intermediary(raw_lines, processes=processes))
+        name = f"processes={processes}"
+        print(f"{name:>12}: {len(raw_lines) / duration:12,.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
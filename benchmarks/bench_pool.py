@@ -0,0 +1,61 @@
+"""Benchmark of the render of many small diagrams, a dot process per render or a pool of workers.
+
+Run with `python benchmarks/bench_pool.py [n_diagrams] [n_tables]`, the renders with the
+graphviz package need the dot program.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+
+from common import er_lines, timeit
+
+from eralchemy import RenderPool
+from eralchemy import main as eralchemy_main
+from eralchemy.main import _intermediary_to_dot
+from eralchemy.parser import line_iterator_to_intermediary
+
+
+def time_pool(dot_file: str, n_diagrams: int) -> float:
+    with RenderPool() as pool:
+        # starts the workers
+        pool.render(dot_file, "dot", "svg")
+        return timeit(
+            lambda: [
+                future.result()
+                for future in [pool.submit(dot_file, "dot", "svg") for _ in range(n_diagrams)]
+            ],
+            1,
+        )
+
+
+def main(n_diagrams: int = 200, n_tables: int = 5) -> None:
+    tables, relationships = line_iterator_to_intermediary(er_lines(n_tables, 5))
+    dot_file = _intermediary_to_dot(tables, relationships)
+    print(f"{n_diagrams} diagrams of {n_tables} tables, {os.cpu_count()} cores")
+
+    binding = eralchemy_main._graphviz()
+    if binding is not None and binding.__name__ == "pygraphviz":
+        duration = timeit(
+            lambda: [eralchemy_main._render_dot(dot_file, "dot", "svg") for _ in range(n_diagrams)],
+            1,
+        )
+        print(f"pygraphviz in the process: {duration:.2f}s")
+        print(f"pool with pygraphviz: {time_pool(dot_file, n_diagrams):.2f}s")
+
+    if shutil.which("dot"):
+        import graphviz
+
+        duration = timeit(
+            lambda: [graphviz.Source(dot_file).pipe(format="svg") for _ in range(n_diagrams)], 1
+        )
+        print(f"graphviz package, a dot process per render: {duration:.2f}s")
+        # the workers forked by the pool render with the graphviz package as well
+        eralchemy_main._graphviz = lambda: graphviz  # type: ignore[assignment]
+        print(f"pool with a dot process per worker: {time_pool(dot_file, n_diagrams):.2f}s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,56 @@
+"""Synthetic schemas used by the benchmarks."""
+
+from __future__ import annotations
+
+import random
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+TYPES = ("INTEGER", "VARCHAR(255)", "TEXT", "DATETIME", "BOOLEAN")
+
+
+def er_lines(n_tables: int, n_columns: int = 15) -> Iterator[str]:
+    """Yield the lines of a markdown file with a chain of related tables."""
+    for t in range(n_tables):
+        yield f"[table_{t}]"
+        yield '    *id {label:"INTEGER"}'
+        for c in range(1, n_columns):
+            yield f'    column_{c} {{label:"{TYPES[c % len(TYPES)]}"}}  # comment'
+    for t in range(1, n_tables):
+        yield f'table_{t}."column_1" *--1 table_{t - 1}."id"'
+
+
+def islands_lines(n_islands: int, island_size: int, n_columns: int = 5) -> Iterator[str]:
+    """Yield the lines of a markdown file with n_islands unrelated chains of tables."""
+    for i in range(n_islands):
+        for t in range(island_size):
+            yield f"[island_{i}_table_{t}]"
+            yield '    *id {label:"INTEGER"}'
+            for c in range(1, n_columns):
+                yield f'    column_{c} {{label:"{TYPES[c % len(TYPES)]}"}}'
+        for t in range(1, island_size):
+            yield f'island_{i}_table_{t}."column_1" *--1 island_{i}_table_{t - 1}."id"'
+
+
+def random_lines(n_tables: int, n_relations: int, seed: int = 0) -> Iterator[str]:
+    """Yield the lines of a markdown file with relations between random tables."""
+    rng = random.Random(seed)
+    for t in range(n_tables):
+        yield f"[table_{t}]"
+        yield '    *id {label:"INTEGER"}'
+        for c in range(1, 8):
+            yield f'    column_{c} {{label:"{TYPES[c % len(TYPES)]}"}}'
+    for r in range(n_relations):
+        child = rng.randrange(1, n_tables)
+        yield f'table_{child}."column_{r % 7 + 1}" *--1 table_{rng.randrange(child)}."id"'
+
+
+def timeit(func: Callable[[], Any], repeat: int = 3) -> float:
+    """Return the best wall time of `repeat` calls of func."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -1,3 +1,14 @@
-from .main import __version__, render_er
+from .cst import RenderConfig
+from .main import render_er, render_many
+from .pool import RenderPool
 
-__all__ = ("render_er", "__version__")
+__all__ = ("RenderConfig", "RenderPool", "render_er", "render_many", "__version__")
+
+
+def __getattr__(name):
+    # the version is read from the package metadata on first access
+    if name == "__version__":
+        from .main import _version
+
+        return _version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,197 @@
+"""On-disk cache of the intermediary representation parsed from markdown files and of the images."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import marshal
+import os
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+from .models import Column, Relation, Table
+from .parser import line_iterator_to_intermediary
+
+# 256 MB
+DEFAULT_CACHE_SIZE = 256 * 1024 * 1024
+CACHE_DIR_ENV = "ERALCHEMY_CACHE_DIR"
+
+
+class FileCache:
+    """Directory of files bounded in size, the least recently used files are evicted first.
+
+    The entries are written atomically so that the cache can be shared by concurrent jobs.
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    def get(self, key: str) -> bytes | None:
+        path = self.directory / key
+        try:
+            value = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            # the modification time is used as last access time for the eviction
+            os.utime(path)
+        except OSError:
+            # a read-only or shared cache directory is still read
+            pass
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(value)
+        os.replace(tmp_path, self.directory / key)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_size."""
+        entries = []
+        for path in self.directory.iterdir():
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries, key=lambda entry: entry[0]):
+            if size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+
+
+def get_cache(cache_dir: str | os.PathLike | None = None) -> FileCache | None:
+    """Returns the cache in cache_dir, defaults to the ERALCHEMY_CACHE_DIR environment variable.
+
+    Returns None if no cache directory is configured.
+    """
+    cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+    return FileCache(cache_dir)
+
+
+def file_digest(filename: str | os.PathLike) -> str:
+    """Returns the sha256 hex digest of the content of the file."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dump_intermediary(tables: list[Table], relationships: list[Relation]) -> bytes:
+    """Serialize the intermediary representation to a compact binary form."""
+    return marshal.dumps(
+        (
+            [
+                (
+                    t.name,
+                    [(c.name, c.type, c.is_key, c.is_null, c.is_foreign_key) for c in t.columns],
+                )
+                for t in tables
+            ],
+            [
+                (
+                    r.right_table,
+                    r.left_table,
+                    r.right_cardinality,
+                    r.left_cardinality,
+                    r.right_column,
+                    r.left_column,
+                )
+                for r in relationships
+            ],
+        )
+    )
+
+
+def load_intermediary(data: bytes) -> tuple[list[Table], list[Relation]]:
+    """Deserialize the intermediary representation dumped with `dump_intermediary`."""
+    tables, relationships = marshal.loads(data)
+    return (
+        [Table(name, [Column(*column) for column in columns]) for name, columns in tables],
+        [Relation(*relation) for relation in relationships],
+    )
+
+
+class _DigestReader(io.RawIOBase):
+    """Binary file hashing the bytes read from it."""
+
+    def __init__(self, file: io.BufferedIOBase) -> None:
+        self._file = file
+        self.digest = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = self._file.readinto(buffer)
+        self.digest.update(memoryview(buffer)[:size])
+        return size
+
+
+def cached_markdown_file_to_intermediary(
+    filename: str,
+    cache: FileCache,
+    version: str,
+) -> tuple[list[Table], list[Relation]]:
+    """Parse a markdown file, reusing the intermediary cached for the same content.
+
+    The entries are keyed by the hash of the file and the version of eralchemy. The parsed
+    content is hashed again while it is read, so a file modified meanwhile is stored under the
+    hash of the content actually parsed.
+    """
+    data = cache.get(_markdown_key(file_digest(filename), version))
+    if data is not None:
+        return load_intermediary(data)
+    with open(filename, "rb") as f:
+        reader = _DigestReader(f)
+        tables, relationships = line_iterator_to_intermediary(
+            io.TextIOWrapper(io.BufferedReader(reader))
+        )
+    cache.set(
+        _markdown_key(reader.digest.hexdigest(), version), dump_intermediary(tables, relationships)
+    )
+    return tables, relationships
+
+
+def _markdown_key(digest: str, version: str) -> str:
+    # the marshal format is specific to the python version
+    return f"er-{digest}-{version}-{sys.implementation.cache_tag}"
+
+
+def cached_render(
+    cache: FileCache,
+    dot_source: str,
+    engine: str,
+    format: str,
+    graphviz_version: str,
+    render: Callable[[], bytes],
+) -> bytes:
+    """Returns the image rendered by render, reusing the image cached for the same inputs.
+
+    The entries are keyed by the hash of the dot source, the engine, the format and the version
+    of graphviz, so the image is rendered again when any of them changes.
+    """
+    digest = hashlib.sha256()
+    for part in (dot_source, engine, format, graphviz_version):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    key = f"img-{digest.hexdigest()}.{format}"
+    data = cache.get(key)
+    if data is not None:
+        return data
+    data = render()
+    cache.set(key, data)
+    return data
@@ -0,0 +1,115 @@
+"""Columnar representation of the tables of the intermediary syntax.
+
+For catalogs with hundreds of thousands of columns, storing the columns as parallel arrays is
+much more compact than a list of `Column` objects, and the filters can be evaluated once per
+distinct name instead of once per column.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from itertools import compress
+
+from .models import Column, Table
+
+
+class ColumnarTables:
+    """Tables stored as arrays of column attributes.
+
+    The columns of the table `i` are at the indexes `table_offsets[i]:table_offsets[i + 1]` of
+    the column arrays. The names and types are interned, the flags stored as arrays of bytes.
+
+    Iterating over a `ColumnarTables` yields `Table` objects built on the fly, so it can be given
+    to `filter_resources` and to the `intermediary_to_*` functions in place of a list of tables.
+    """
+
+    def __init__(self) -> None:
+        self.table_names: list[str] = []
+        self.table_offsets = array("q", [0])
+        self.column_names: list[str] = []
+        self.column_types: list[str | None] = []
+        self.is_key = array("b")
+        self.is_null = array("b")
+        self.is_foreign_key = array("b")
+
+    @classmethod
+    def from_tables(cls, tables: Iterable[Table]) -> ColumnarTables:
+        store = cls()
+        for table in tables:
+            store.append(table)
+        return store
+
+    def append(self, table: Table) -> None:
+        self.table_names.append(table.name)
+        for column in table.columns:
+            self.column_names.append(sys.intern(column.name))
+            self.column_types.append(
+                sys.intern(column.type) if isinstance(column.type, str) else column.type
+            )
+            self.is_key.append(column.is_key)
+            self.is_null.append(column.is_null)
+            self.is_foreign_key.append(column.is_foreign_key)
+        self.table_offsets.append(len(self.column_names))
+
+    def to_tables(self) -> list[Table]:
+        return list(self)
+
+    def _table(self, index: int) -> Table:
+        start, end = self.table_offsets[index], self.table_offsets[index + 1]
+        return Table(
+            name=self.table_names[index],
+            columns=[
+                Column(
+                    name=self.column_names[i],
+                    type=self.column_types[i],
+                    is_key=bool(self.is_key[i]),
+                    is_null=bool(self.is_null[i]),
+                    is_foreign_key=bool(self.is_foreign_key[i]),
+                )
+                for i in range(start, end)
+            ],
+        )
+
+    def __iter__(self) -> Iterator[Table]:
+        return (self._table(index) for index in range(len(self.table_names)))
+
+    def __len__(self) -> int:
+        return len(self.table_names)
+
+    def filter(
+        self,
+        check_table: Callable[[str], object],
+        check_column: Callable[[str], object],
+        sort_mode: str = "alphabetical",
+    ) -> ColumnarTables:
+        """Returns the tables and columns passing the checks, with the columns sorted.
+
+        The checks are evaluated once per distinct name, the columns are then selected with
+        the resulting masks.
+        """
+        table_mask = _mask(self.table_names, check_table)
+        column_mask = _mask(self.column_names, check_column)
+        store = ColumnarTables()
+        for index in compress(range(len(self.table_names)), table_mask):
+            start, end = self.table_offsets[index], self.table_offsets[index + 1]
+            indexes = list(compress(range(start, end), column_mask[start:end]))
+            if sort_mode == "original":
+                indexes.sort(key=lambda i: not self.is_key[i])
+            else:
+                # same order as sorting the columns with Column.__lt__
+                indexes.sort(key=lambda i: (not self.is_key[i], self.column_names[i]))
+            store.table_names.append(self.table_names[index])
+            store.column_names.extend(self.column_names[i] for i in indexes)
+            store.column_types.extend(self.column_types[i] for i in indexes)
+            store.is_key.extend(self.is_key[i] for i in indexes)
+            store.is_null.extend(self.is_null[i] for i in indexes)
+            store.is_foreign_key.extend(self.is_foreign_key[i] for i in indexes)
+            store.table_offsets.append(len(store.column_names))
+        return store
+
+
+def _mask(names: list[str], check: Callable[[str], object]) -> array:
+    results = {name: bool(check(name)) for name in set(names)}
+    return array("b", (results[name] for name in names))
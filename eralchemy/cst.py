@@ -1,5 +1,9 @@
 """All the constants used in the module."""
 
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+
 DOT_TABLE = (
     '"{}" [label=<<FONT FACE="Helvetica"><TABLE BORDER="0" CELLBORDER="1"'
     ' CELLPADDING="4" CELLSPACING="0">{}{}</TABLE></FONT>>];'
@@ -33,35 +37,103 @@ DEFAULT_CONFIG = {
 config = DEFAULT_CONFIG.copy()
 
 
+class RenderConfig(Mapping[str, str]):
+    """Immutable config of a rendering, with the keys of `DEFAULT_CONFIG`.
+
+    It is passed to `render_er` as render_config in place of adjusting the global `config`,
+    so that renders with different configs can run at once in threads. The adjustments return
+    a new config::
+
+        render_config = RenderConfig().star_primary().top_down()
+
+    :param values: values of the config, the missing keys have their default value.
+    :param overrides: values of the config, overriding the ones of values.
+    """
+
+    __slots__ = ("_values",)
+    _values: dict[str, str]
+
+    def __init__(self, values: Mapping[str, str] | None = None, **overrides: str) -> None:
+        values = {**DEFAULT_CONFIG, **(values or {}), **overrides}
+        unknown = set(values) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown config keys: {', '.join(sorted(unknown))}")
+        object.__setattr__(self, "_values", values)
+
+    @classmethod
+    def current(cls) -> RenderConfig:
+        """Returns a snapshot of the global config."""
+        return cls(config)
+
+    def __getitem__(self, key: str) -> str:
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable, use replace")
+
+    def __hash__(self) -> int:
+        return hash(tuple(self._values.items()))
+
+    def __repr__(self) -> str:
+        return f"RenderConfig({self._values!r})"
+
+    def __reduce__(self):
+        return RenderConfig, (self._values,)
+
+    def replace(self, **values: str) -> RenderConfig:
+        """Returns a copy of the config with the values replaced."""
+        return RenderConfig(self, **values)
+
+    def star_primary(self) -> RenderConfig:
+        return self.replace(DOT_KEY_OPENING="*", DOT_KEY_CLOSING="")
+
+    def star_underline(self) -> RenderConfig:
+        return self.replace(DOT_KEY_OPENING="<u>", DOT_KEY_CLOSING="</u>")
+
+    def top_down(self) -> RenderConfig:
+        beginning = self["DOT_GRAPH_BEGINNING"].replace("rankdir=LR", "rankdir=TB")
+        return self.replace(DOT_GRAPH_BEGINNING=beginning)
+
+    def left_right(self) -> RenderConfig:
+        beginning = self["DOT_GRAPH_BEGINNING"].replace("rankdir=TB", "rankdir=LR")
+        return self.replace(DOT_GRAPH_BEGINNING=beginning)
+
+    def digraph(self) -> RenderConfig:
+        beginning = self["DOT_GRAPH_BEGINNING"].replace("graph {", "digraph {")
+        return self.replace(DOT_GRAPH_BEGINNING=beginning, DOT_RELATION_GRAPH="digraph")
+
+    def crowfoot(self) -> RenderConfig:
+        return self.replace(DOT_RELATION_STYLE="crow")
+
+
 def dot_star_primary():
-    config["DOT_KEY_OPENING"] = "*"
-    config["DOT_KEY_CLOSING"] = ""
+    config.update(RenderConfig.current().star_primary())
 
 
 def dot_star_underline():
-    config["DOT_KEY_OPENING"] = "<u>"
-    config["DOT_KEY_CLOSING"] = "</u>"
+    config.update(RenderConfig.current().star_underline())
 
 
 def dot_top_down():
-    config["DOT_GRAPH_BEGINNING"] = config["DOT_GRAPH_BEGINNING"].replace(
-        "rankdir=LR", "rankdir=TB"
-    )
+    config.update(RenderConfig.current().top_down())
 
 
 def dot_left_right():
-    config["DOT_GRAPH_BEGINNING"] = config["DOT_GRAPH_BEGINNING"].replace(
-        "rankdir=TB", "rankdir=LR"
-    )
+    config.update(RenderConfig.current().left_right())
 
 
 def dot_digraph():
-    config["DOT_GRAPH_BEGINNING"] = config["DOT_GRAPH_BEGINNING"].replace("graph {", "digraph {")
-    config["DOT_RELATION_GRAPH"] = "digraph"
+    config.update(RenderConfig.current().digraph())
 
 
 def dot_crowfoot():
-    config["DOT_RELATION_STYLE"] = "crow"
+    config.update(RenderConfig.current().crowfoot())
 
 
 def reset_config():
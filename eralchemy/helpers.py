@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import base64
+import os
+import re
 import string
 import sys
 from argparse import Namespace
-from typing import TYPE_CHECKING, Any
-from zlib import compress
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from typing import IO, TYPE_CHECKING, Any
+from zlib import compress, compressobj
 
 if TYPE_CHECKING:
-    from .models import Column
+    from .models import Column, Relation
 
 # from https://github.com/dougn/python-plantuml/blob/master/plantuml.py
 plantuml_alphabet = string.digits + string.ascii_uppercase + string.ascii_lowercase + "-_"
@@ -33,8 +37,24 @@ def check_args(args: Namespace) -> None:
             print("non_version_attrs", non_version_attrs)
             fail("Cannot show the version number with another command.")
         return
+    if args.batch is not None:
+        if args.i is not None or args.o is not None or args.watch:
+            fail("The inputs and outputs of the batch are read from its manifest.")
+        return
     if args.i is None:
         fail("Cannot draw ER diagram of no database.")
+    if args.depth is not None and not args.focus:
+        fail("The depth can only be given with --focus.")
+    if args.depth is not None and args.depth < 0:
+        fail("The depth cannot be negative.")
+    if args.serve is not None:
+        if args.o is not None or args.watch:
+            fail("The diagrams are rendered on request when serving.")
+        return
+    if args.watch and (args.o is None or len(args.o) != 1 or not args.i.endswith(".er")):
+        fail("Can only watch a markdown file rendered to an output file.")
+    if args.m is not None and args.o is not None and len(args.o) > 1:
+        fail("The mode is chosen from the extension of each file when writing several outputs.")
 
 
 def check_args_has_attributes(args: Namespace) -> None:
@@ -52,6 +72,17 @@ def check_args_has_attribute(args: Namespace, name: str) -> None:
         raise Exception(f"{name} should be set")
 
 
+def load_toml(filename: str | os.PathLike) -> dict[str, Any]:
+    """Returns the content of the TOML file, read with tomli before Python 3.11."""
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        import tomli as tomllib
+
+    with open(filename, "rb") as f:
+        return tomllib.load(f)
+
+
 def plantuml_convert(puml_markup):
     zlibbed_str = compress(puml_markup.encode("utf-8"))
     compressed_string = zlibbed_str[2:-4]
@@ -59,6 +90,56 @@ def plantuml_convert(puml_markup):
     return markup_encoded
 
 
+def iter_plantuml_convert(chunks: Iterable[str]) -> Iterator[str]:
+    """Yields piece by piece the same encoding as `plantuml_convert` of the joined chunks."""
+    compressor = compressobj()
+
+    def deflated() -> Iterator[bytes]:
+        # strips the 2 bytes header and the 4 bytes checksum of the zlib format
+        head, tail = 2, b""
+        for chunk in chunks:
+            data = tail + compressor.compress(chunk.encode("utf-8"))
+            data, head = data[head:], max(head - len(data), 0)
+            data, tail = data[:-4], data[-4:]
+            yield data
+        yield (tail + compressor.flush())[head:-4]
+
+    for encoded in iter_base64(deflated()):
+        yield encoded.translate(b64_to_plantuml).decode("utf-8")
+
+
+def iter_base64(
+    chunks: Iterable[bytes],
+    encode: Callable[[bytes], bytes] = base64.b64encode,
+) -> Iterator[bytes]:
+    """Yields piece by piece the base64 encoding of the joined chunks."""
+    rest = b""
+    for chunk in chunks:
+        data = rest + chunk
+        # 3 bytes are encoded as 4 characters without padding
+        end = len(data) - len(data) % 3
+        if end:
+            yield encode(data[:end])
+        rest = data[end:]
+    if rest:
+        yield encode(rest)
+
+
+def write_chunks(chunks: Iterable[str], sink: IO[bytes], buffer_size: int = 64 * 1024) -> None:
+    """Encodes the chunks and writes them to the binary sink by blocks of buffer_size characters."""
+    buffer: list[str] = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            sink.write("".join(buffer).encode())
+            buffer.clear()
+            size = 0
+    if buffer:
+        sink.write("".join(buffer).encode())
+
+
 def original_order_keys_first(column: Column) -> bool:
     """Function can be used with sorted() and places columns with primary keys first.
 
@@ -74,3 +155,56 @@ def original_order_keys_first(column: Column) -> bool:
     :return: Boolean indicating if the column is not a key column
     """
     return not column.is_key
+
+
+# characters with a special meaning in a regex outside of a character class
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+
+class NamePatterns:
+    """Matches names against a list of regex patterns which must match the whole name.
+
+    The patterns without any regex metacharacter are looked up in a set, the other ones are
+    combined in a single compiled regex. The result is memoized for each distinct name.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.literals: set[str] = set()
+        regexes = []
+        for pattern in patterns:
+            if REGEX_METACHARACTERS.isdisjoint(pattern):
+                self.literals.add(pattern)
+            else:
+                regexes.append(pattern)
+        self.regex = re.compile("|".join(f"({p})" for p in regexes)) if regexes else None
+        self._cache: dict[str, bool] = {}
+
+    def __call__(self, name: str) -> bool:
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        matched = name in self.literals or (
+            self.regex is not None and self.regex.fullmatch(name) is not None
+        )
+        self._cache[name] = matched
+        return matched
+
+
+def neighborhood(relationships: Iterable[Relation], seeds: Iterable[str], depth: int) -> set[str]:
+    """Returns the names of the tables at most depth relations away from the seeds tables."""
+    adjacency: dict[str, set[str]] = {}
+    for r in relationships:
+        adjacency.setdefault(r.left_table, set()).add(r.right_table)
+        adjacency.setdefault(r.right_table, set()).add(r.left_table)
+    visited = set(seeds)
+    queue = deque((name, 0) for name in visited)
+    while queue:
+        name, distance = queue.popleft()
+        if distance == depth:
+            continue
+        for neighbor in adjacency.get(name, ()):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append((neighbor, distance + 1))
+    return visited
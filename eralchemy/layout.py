@@ -0,0 +1,282 @@
+"""Layout of the disconnected components of a schema in parallel, packed in a single graph.
+
+Each component is laid out by graphviz in a worker process, then the laid out components are
+translated next to each other and rendered with the positions kept (the `nop2` engine).
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from .models import Relation, Table
+
+# space in points between the packed components
+PACK_MARGIN = 8
+
+ENGINES = ("dot", "neato", "fdp", "sfdp", "circo", "twopi", "osage", "patchwork")
+# graph attributes removing the overlaps of the tables with the force directed engines,
+# scale is much faster than prism on large schemas and does not need the triangulation library
+ENGINE_GRAPH_ATTRIBUTES = {
+    "neato": "overlap=scale",
+    "fdp": "overlap=scale",
+    "sfdp": "overlap=scale",
+}
+# largest graphs laid out with dot by the auto engine, the duration of dot grows quickly with
+# the number of relations, see benchmarks/bench_engine.py
+DOT_MAX_NODES = 1000
+DOT_MAX_EDGES = 1000
+# engine of the degraded layouts when the layout overruns its deadline
+FAST_ENGINE = "sfdp"
+
+_DOT_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|<|[^"<]+', re.S)
+_HTML_TOKEN = re.compile(r"<|>|[^<>]+")
+_COORDINATES_ATTRIBUTE = re.compile(r"\b(?:bb|pos|lp|head_lp|tail_lp|xlp)=$")
+_BB = re.compile(r'\bbb="([^"]*)"')
+
+
+def connected_components(
+    tables: Iterable[Table], relationships: Iterable[Relation]
+) -> list[tuple[list[Table], list[Relation]]]:
+    """Returns the tables and relations of each group of tables connected by relations."""
+    parents: dict[str, str] = {}
+
+    def find(name: str) -> str:
+        root = name
+        while parents.setdefault(root, root) != root:
+            root = parents[root]
+        while parents[name] != root:
+            parents[name], name = root, parents[name]
+        return root
+
+    relationships = list(relationships)
+    for r in relationships:
+        parents[find(r.left_table)] = find(r.right_table)
+
+    components: dict[str, tuple[list[Table], list[Relation]]] = {}
+    for t in tables:
+        components.setdefault(find(t.name), ([], []))[0].append(t)
+    for r in relationships:
+        component = components.get(find(r.left_table))
+        if component is not None:
+            component[1].append(r)
+    return list(components.values())
+
+
+class LayoutTimeoutError(TimeoutError):
+    """Raised when the layout of the graph did not finish before its deadline."""
+
+
+def run_with_timeout(func: Callable[[], Any], timeout: float) -> Any:
+    """Returns func() computed in a child process, killed if it runs longer than timeout seconds.
+
+    func must be picklable, the exceptions it raises are raised again. The processes started by
+    func, graphviz or the workers of the parallel layout, are killed with it.
+    """
+    import multiprocessing
+
+    context = multiprocessing.get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    # not a daemon so that func can start a pool of processes, it is killed below in any case
+    process = context.Process(target=_send_result, args=(sender, func))
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise LayoutTimeoutError(f"the layout did not finish in {timeout}s")
+        failed, result = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"the layout process died with the exit code {process.exitcode}")
+    finally:
+        _kill_process_group(process.pid)
+        process.kill()
+        process.join()
+        receiver.close()
+    if failed:
+        raise result
+    return result
+
+
+def _send_result(sender: Any, func: Callable[[], Any]) -> None:
+    if hasattr(os, "setpgrp"):
+        # the process and its children are killed together by _kill_process_group
+        os.setpgrp()
+    try:
+        result = (False, func())
+    except Exception as e:
+        result = (True, e)
+    sender.send(result)
+    sender.close()
+
+
+def _kill_process_group(pid: int | None) -> None:
+    if pid is None or not hasattr(os, "killpg"):
+        return
+    import signal
+
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        # the group is gone, or the process did not create it and has no children yet
+        pass
+
+
+def degraded_layouts(
+    tables: list[Table], relationships: list[Relation], engine: str
+) -> Iterator[tuple[str, list[Table], list[Relation], str]]:
+    """Yields the layouts to try in order, each one faster than the previous one.
+
+    The layouts are described, and come with the tables, the relationships and the engine:
+    the requested engine, then the fast engine, with only the key columns, with only the tables.
+    """
+    yield f"{engine} engine", tables, relationships, engine
+    if engine != FAST_ENGINE:
+        yield f"{FAST_ENGINE} engine", tables, relationships, FAST_ENGINE
+    keys_only = [
+        Table(t.name, [c for c in t.columns if c.is_key or c.is_foreign_key]) for t in tables
+    ]
+    yield f"{FAST_ENGINE} engine with the keys only", keys_only, relationships, FAST_ENGINE
+    tables_only = [Table(t.name, []) for t in tables]
+    relations_only = [
+        Relation(r.right_table, r.left_table, r.right_cardinality, r.left_cardinality)
+        for r in relationships
+    ]
+    yield f"{FAST_ENGINE} engine with the tables only", tables_only, relations_only, FAST_ENGINE
+
+
+def choose_engine(n_nodes: int, n_edges: int) -> str:
+    """Returns dot for the graphs it lays out in a few seconds, sfdp for the larger ones."""
+    if n_nodes <= DOT_MAX_NODES and n_edges <= DOT_MAX_EDGES:
+        return "dot"
+    return "sfdp"
+
+
+def unflatten(
+    tables: Iterable[Table],
+    relationships: Iterable[Relation],
+    leaf_length: int = 3,
+    chain_length: int = 3,
+) -> tuple[dict[int, int], list[tuple[str, str]]]:
+    """Spreads the wide and shallow graphs over more ranks of dot, like the unflatten tool.
+
+    Returns the minlen of the relations to the tables with a single relation, staggered
+    between 2 and leaf_length + 1 for each table they are related to, by index of the relation.
+    Also returns the pairs of tables without any relation to chain with invisible edges,
+    by chains of chain_length tables.
+    """
+    relationships = list(relationships)
+    degrees: dict[str, int] = {}
+    for r in relationships:
+        degrees[r.left_table] = degrees.get(r.left_table, 0) + 1
+        degrees[r.right_table] = degrees.get(r.right_table, 0) + 1
+
+    minlens = {}
+    leaves: dict[str, int] = {}
+    for i, r in enumerate(relationships):
+        if degrees[r.left_table] == 1 and degrees[r.right_table] > 1:
+            hub = r.right_table
+        elif degrees[r.right_table] == 1 and degrees[r.left_table] > 1:
+            hub = r.left_table
+        else:
+            continue
+        leaves[hub] = leaves.get(hub, 0) + 1
+        minlens[i] = 2 + (leaves[hub] - 1) % leaf_length
+
+    alone = [t.name for t in tables if t.name not in degrees]
+    chains = [(alone[i - 1], alone[i]) for i in range(1, len(alone)) if i % chain_length]
+    return minlens, chains
+
+
+def layout_components(
+    sources: list[str],
+    engines: list[str],
+    layout: Callable[[str, str], str],
+    processes: int | None = None,
+) -> list[str]:
+    """Returns the dot sources laid out by layout with their engines in a pool of processes."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    processes = processes or os.cpu_count() or 1
+    # a few chunks per process to balance the load without sending each source separately
+    chunksize = max(1, len(sources) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(layout, sources, engines, chunksize=chunksize))
+
+
+def pack_layouts(layouts: list[str], graph_attributes: str = "") -> str:
+    """Returns a dot source with the laid out graphs placed in rows, the tallest ones first.
+
+    :param graph_attributes: dot statements added to the packed graph, like its label.
+    """
+    boxes = [_bounding_box(layout) for layout in layouts]
+    widths = [urx - llx for llx, _, urx, _ in boxes]
+    area = sum(
+        (w + PACK_MARGIN) * (ury - lly + PACK_MARGIN) for w, (_, lly, _, ury) in zip(widths, boxes)
+    )
+    row_width = max(math.sqrt(area), max(widths, default=0))
+
+    # shelf packing from the top, the y axis of graphviz goes up
+    offsets: dict[int, tuple[float, float]] = {}
+    x = top = row_height = 0.0
+    for i in sorted(range(len(layouts)), key=lambda i: boxes[i][1] - boxes[i][3]):
+        llx, lly, urx, ury = boxes[i]
+        if x and x + urx - llx > row_width:
+            x, top, row_height = 0.0, top - row_height - PACK_MARGIN, 0.0
+        offsets[i] = (x - llx, top - ury)
+        x += urx - llx + PACK_MARGIN
+        row_height = max(row_height, ury - lly)
+
+    header = layouts[0][: layouts[0].index("{") + 1] if layouts else "graph {"
+    subgraphs = [
+        "subgraph {" + translate_layout(_body(layout), *offsets[i]) + "}"
+        for i, layout in enumerate(layouts)
+    ]
+    return "\n".join((header, graph_attributes, *subgraphs, "}"))
+
+
+def translate_layout(source: str, dx: float, dy: float) -> str:
+    """Translates the coordinates of the laid out dot source, the html labels are kept as is."""
+    chunks: list[str] = []
+    pos = depth = 0
+    while pos < len(source):
+        match = (_HTML_TOKEN if depth else _DOT_TOKEN).match(source, pos)
+        assert match is not None
+        token = match.group()
+        pos = match.end()
+        if token == "<":
+            depth += 1
+        elif token == ">":
+            depth -= 1
+        elif not depth and token[0] == '"' and chunks and _COORDINATES_ATTRIBUTE.search(chunks[-1]):
+            token = f'"{_translate_points(token[1:-1], dx, dy)}"'
+        chunks.append(token)
+    return "".join(chunks)
+
+
+def _translate_points(value: str, dx: float, dy: float) -> str:
+    """Translates the points like "e,1,2 3,4" of a coordinates attribute."""
+    points = []
+    for point in value.split():
+        # the end and start points of the edges are prefixed with e, and s,
+        prefix = point[:2] if point[:2] in ("e,", "s,") else ""
+        numbers = point[len(prefix) :].split(",")
+        points.append(
+            prefix
+            + ",".join(f"{float(n) + (dy if i % 2 else dx):.2f}" for i, n in enumerate(numbers))
+        )
+    return " ".join(points)
+
+
+def _bounding_box(layout: str) -> tuple[float, float, float, float]:
+    match = _BB.search(layout)
+    if match is None:
+        return 0.0, 0.0, 0.0, 0.0
+    llx, lly, urx, ury = (float(n) for n in match.group(1).split(","))
+    return llx, lly, urx, ury
+
+
+def _body(layout: str) -> str:
+    return layout[layout.index("{") + 1 : layout.rindex("}")]
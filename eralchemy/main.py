@@ -1,49 +1,63 @@
 import argparse
 import base64
-import copy
 import logging
-import os
-import re
+import operator
 import sys
-from functools import partial
-from importlib.metadata import PackageNotFoundError, version
-
-from sqlalchemy.engine.url import make_url
-from sqlalchemy.exc import ArgumentError
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from typing import IO
 
+from .columnar import ColumnarTables
 from .cst import config
-from .helpers import check_args, original_order_keys_first, plantuml_convert
+from .helpers import (
+    NamePatterns,
+    check_args,
+    iter_base64,
+    iter_plantuml_convert,
+    neighborhood,
+    original_order_keys_first,
+    write_chunks,
+)
+from .layout import (
+    ENGINE_GRAPH_ATTRIBUTES,
+    ENGINES,
+    LayoutTimeoutError,
+    choose_engine,
+    connected_components,
+    degraded_layouts,
+    layout_components,
+    pack_layouts,
+    run_with_timeout,
+)
+from .layout import unflatten as unflatten_graph
+from .models import Table, dot_templates
 from .parser import (
     ParsingException,
     line_iterator_to_intermediary,
     markdown_file_to_intermediary,
 )
-from .sqla import (
-    database_to_intermediary,
-    declarative_to_intermediary,
-    metadata_to_intermediary,
-)
 
-USE_PYGRAPHVIZ = True
-GRAPHVIZ_AVAILABLE = True
-try:
-    from pygraphviz.agraph import AGraph
+# sqlalchemy, graphviz and the caches are imported by the functions needing them, so that the
+# command line starts quickly for the text inputs and outputs.
 
-    logging.debug("using pygraphviz")
-except ImportError:
-    USE_PYGRAPHVIZ = False
-    try:
-        from graphviz import Source
 
-        logging.debug("using graphviz")
-    except ImportError:
-        logging.error("either pygraphviz or graphviz should be installed")
-        GRAPHVIZ_AVAILABLE = False
+def __getattr__(name):
+    if name == "__version__":
+        return _version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-try:
-    __version__ = version(__package__)
-except PackageNotFoundError:
-    __version__ = "na"
+@lru_cache(maxsize=1)
+def _version():
+    """Returns the version of eralchemy, importlib.metadata is only imported when needed."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(__package__)
+    except PackageNotFoundError:
+        return "na"
 
 
 def cli(args=None) -> None:
@@ -53,11 +67,85 @@ def cli(args=None) -> None:
     args = parser.parse_args(args)
     check_args(args)
     if args.v:
-        print(f"eralchemy version {__version__}.")
+        print(f"eralchemy version {_version()}.")
         exit(0)
-    output = render_er(
+    if args.batch:
+        from .batch import load_jobs, print_summary, run_batch
+
+        start = time.perf_counter()
+        failed = True
+        with _print_render_errors():
+            results = run_batch(load_jobs(args.batch), args.batch_processes)
+            print_summary(results, time.perf_counter() - start, sys.stderr)
+            failed = any(result.error is not None for result in results)
+        if failed:
+            exit(1)
+        return
+    if args.serve:
+        from .serve import load_inputs, serve
+
+        with _print_render_errors():
+            serve(
+                args.serve,
+                load_inputs(args.i),
+                cache_dir=args.cache_dir,
+                engine=args.engine or "dot",
+                unflatten=bool(args.unflatten),
+                layout_timeout=args.layout_timeout,
+            )
+        return
+    depth = args.depth
+    if args.watch:
+        from .watch import watch
+
+        watch(
+            args.i,
+            args.o[0],
+            args.m or "auto",
+            title=args.title,
+            include_tables=args.include_tables,
+            include_columns=args.include_columns,
+            exclude_tables=args.exclude_tables,
+            exclude_columns=args.exclude_columns,
+            sort_mode=args.sort_mode,
+            focus=args.focus,
+            depth=depth,
+            cache_dir=args.cache_dir,
+            layout_processes=args.layout_processes,
+            engine=args.engine or "dot",
+            unflatten=bool(args.unflatten),
+            layout_timeout=args.layout_timeout,
+        )
+        return
+    if args.o and len(args.o) > 1:
+        render_many(
+            args.i,
+            args.o,
+            title=args.title,
+            include_tables=args.include_tables,
+            include_columns=args.include_columns,
+            exclude_tables=args.exclude_tables,
+            exclude_columns=args.exclude_columns,
+            schema=args.s,
+            sort_mode=args.sort_mode,
+            cache_dir=args.cache_dir,
+            focus=args.focus,
+            depth=depth,
+            layout_processes=args.layout_processes,
+            engine=args.engine or "dot",
+            unflatten=bool(args.unflatten),
+            layout_timeout=args.layout_timeout,
+        )
+        return
+    if args.o:
+        output = args.o[0]
+    else:
+        # the text written to sys.stdout so far goes first
+        sys.stdout.flush()
+        output = sys.stdout.buffer
+    render_er(
         args.i,
-        args.o,
+        output,
         args.m or "auto",
         title=args.title,
         include_tables=args.include_tables,
@@ -66,17 +154,30 @@ def cli(args=None) -> None:
         exclude_columns=args.exclude_columns,
         schema=args.s,
         sort_mode=args.sort_mode,
+        cache_dir=args.cache_dir,
+        focus=args.focus,
+        depth=depth,
+        layout_processes=args.layout_processes,
+        engine=args.engine or "dot",
+        unflatten=bool(args.unflatten),
+        layout_timeout=args.layout_timeout,
     )
-    if output:
-        with os.fdopen(sys.stdout.fileno(), "wb", closefd=False) as stdout:
-            stdout.write(output)
-            stdout.flush()
+    if not args.o:
+        output.flush()
 
 
 def get_argparser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="eralchemy")
-    parser.add_argument("-i", nargs="?", help="Database URI to process.")
-    parser.add_argument("-o", nargs="?", help="Name of the file to write.")
+    parser.add_argument(
+        "-i",
+        nargs="?",
+        help="Database URI or markdown file to process, - reads markdown from stdin.",
+    )
+    parser.add_argument(
+        "-o",
+        action="append",
+        help="Name of the file to write, can be repeated to write several outputs.",
+    )
     parser.add_argument("-s", nargs="?", help="Name of the schema.")
     parser.add_argument("--title", nargs="?", help="Add a title to the output graph")
     parser.add_argument(
@@ -105,150 +206,454 @@ def get_argparser() -> argparse.ArgumentParser:
         nargs="+",
         help="Name of columns to be displayed alone (for all tables).",
     )
+    parser.add_argument(
+        "--focus",
+        nargs="+",
+        help="Name of tables around which the graph is rendered.",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        help="Maximal number of relations between the focus and the displayed tables,"
+        " only with --focus, default: 1",
+    )
     parser.add_argument(
         "--sort_mode",
         nargs="?",
         choices=["alphabetical", "original"],
         help="sorting mode for the key columns and then the non-key columns, default: alphabetical",
     )
+    parser.add_argument(
+        "--layout-processes",
+        type=int,
+        help="Lay out the groups of tables not connected by any relation in parallel"
+        " in this number of processes, 0 for all the cores.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["auto", *ENGINES],
+        help="Graphviz engine laying out the graph, auto chooses it from the size of the graph,"
+        " default: dot",
+    )
+    parser.add_argument(
+        "--unflatten",
+        action="store_true",
+        default=None,
+        help="Spread the wide graphs over more ranks.",
+    )
+    parser.add_argument(
+        "--layout-timeout",
+        type=float,
+        help="Seconds after which the layout is stopped and a cheaper one tried.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        nargs="?",
+        help="Directory caching the parsed markdown files and the images, default: $ERALCHEMY_CACHE_DIR",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        default=None,
+        help="Render the markdown file again each time it is modified.",
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        help="TOML manifest of the jobs to render in a pool of processes, see eralchemy.batch.",
+    )
+    parser.add_argument(
+        "--batch-processes",
+        type=int,
+        help="Number of processes rendering the jobs of the batch, default: all the cores",
+    )
+    parser.add_argument(
+        "--serve",
+        nargs="?",
+        help="Serve the diagrams of the inputs of the TOML file -i over HTTP on this address,"
+        " host:port, port or the path of a unix socket, see eralchemy.serve.",
+    )
     parser.add_argument("-v", help="Prints version number.", action="store_true")
     return parser
 
 
-def intermediary_to_markdown(tables, relationships, title=""):
+def intermediary_to_markdown(tables, relationships, title="", render_config=None):
     """Saves the intermediary representation to markdown."""
-    er_markup = _intermediary_to_markdown(tables, relationships)
-    if title:
-        format_title = config["MARKDOWN_TITLE"].format(title)
-        er_markup_with_config = f"{format_title}\n{er_markup}"
-    else:
-        er_markup_with_config = er_markup
-    return er_markup_with_config.encode()
+    return "".join(emit_markdown(tables, relationships, title, render_config)).encode()
 
 
 def intermediary_to_mermaid(tables, relationships, title=""):
     """Saves the intermediary representation to markdown."""
-    markup = _intermediary_to_mermaid(tables, relationships)
-    if title:
-        markup = f"""---
-title: {title}
----
-{markup}
-"""
-    md_markup = f"<!--\n\n{markup}\n\n-->\n"
-    markup_b64 = base64.urlsafe_b64encode(markup.encode("utf8")).decode("ascii")
-    md_markup += f"![](https://mermaid.ink/img/{markup_b64})\n"
-    return md_markup.encode()
+    return "".join(emit_mermaid(tables, relationships, title)).encode()
 
 
 def intermediary_to_mermaid_er(tables, relationships, title=""):
     """Saves the intermediary representation to markdown."""
-    markup = _intermediary_to_mermaid_er(tables, relationships)
-    if title:
-        markup = f"""---
-title: {title}
----
-{markup}
-"""
-    md_markup = f"<!--\n\n{markup}\n\n-->\n"
-    markup_b64 = base64.urlsafe_b64encode(markup.encode("utf8")).decode("ascii")
-    md_markup += f"![](https://mermaid.ink/img/{markup_b64})\n"
-    return md_markup.encode()
-
-
-def intermediary_to_dot(tables, relationships, title=""):
-    """Save the intermediary representation to dot format."""
-    dot_file = _intermediary_to_dot(tables, relationships, title)
-    return dot_file.encode()
-
-
-def intermediary_to_schema(tables, relationships, title="", extension="png"):
-    """Transforms and save the intermediary representation to the file chosen."""
-    dot_file = _intermediary_to_dot(tables, relationships, title)
-    if not GRAPHVIZ_AVAILABLE:
+    return "".join(emit_mermaid_er(tables, relationships, title)).encode()
+
+
+def intermediary_to_dot(tables, relationships, title="", render_config=None):
+    """Save the intermediary representation to dot format.
+
+    The render_config (a `cst.RenderConfig`) defaults to the global `cst.config`.
+    """
+    return _intermediary_to_dot(tables, relationships, title, render_config=render_config).encode()
+
+
+def intermediary_to_schema(
+    tables,
+    relationships,
+    title="",
+    extension="png",
+    cache_dir=None,
+    layout_processes=None,
+    engine="dot",
+    unflatten=False,
+    layout_timeout=None,
+    render_pool=None,
+    render_config=None,
+):
+    """Transforms and save the intermediary representation to the file chosen.
+
+    The images are cached in cache_dir (defaults to $ERALCHEMY_CACHE_DIR) if it is set.
+    If layout_processes is set, the components of the graph which are not connected by any
+    relation are laid out in parallel in as many processes (all the cores if 0), then packed.
+    The graphviz engine 'auto' is chosen from the number of tables and relations
+    (of each component if they are laid out in parallel), see `layout.choose_engine`.
+    If layout_timeout is set, graphviz is killed after this number of seconds and cheaper
+    layouts are tried, see `layout.degraded_layouts`. Each overrun is logged as a warning.
+    If render_pool is set, the images are rendered by its workers (see `pool.RenderPool`),
+    except with a layout_timeout which needs a process of its own to kill.
+    The render_config (a `cst.RenderConfig`) defaults to the global `cst.config`.
+    """
+    if _graphviz() is None:
         raise Exception("either pygraphviz or graphviz should be installed")
-    if USE_PYGRAPHVIZ:
-        graph = AGraph()
+    from .cache import cached_render, get_cache
+
+    if layout_timeout is None:
+        layouts = [("", tables, relationships, engine)]
+    else:
+        layouts = degraded_layouts(list(tables), list(relationships), engine)
+    render_dot = _render_dot
+    if render_pool is not None and layout_timeout is None:
+        render_dot = render_pool.render
+    cache = get_cache(cache_dir)
+    overruns = []
+    previous = None
+    for description, layout_tables, layout_relationships, layout_engine in layouts:
+        dot_file, key, render = _schema_renderer(
+            layout_tables,
+            layout_relationships,
+            title,
+            extension,
+            layout_processes,
+            layout_engine,
+            unflatten,
+            render_dot,
+            render_config,
+        )
+        # the auto engine may have chosen the engine of the next layout
+        if (dot_file, key) == previous:
+            continue
+        previous = (dot_file, key)
+        if layout_timeout is not None:
+            render = partial(run_with_timeout, render, layout_timeout)
+        try:
+            if cache is None:
+                return render()
+            return cached_render(cache, dot_file, key, extension, _graphviz_version(), render)
+        except LayoutTimeoutError:
+            logging.warning("layout with the %s did not finish in %ss", description, layout_timeout)
+            overruns.append(description)
+    raise LayoutTimeoutError(
+        f"no layout finished in {layout_timeout}s, tried the {', '.join(overruns)}"
+    )
+
+
+def _schema_renderer(
+    tables,
+    relationships,
+    title,
+    extension,
+    layout_processes,
+    engine,
+    unflatten,
+    render_dot,
+    render_config,
+):
+    """Returns the dot source, the cache key of the layout and the function rendering it."""
+    components = None
+    if layout_processes is not None:
+        components = connected_components(tables, relationships)
+    if components is not None and len(components) > 1:
+        dot_file = _intermediary_to_dot(tables, relationships, title, render_config=render_config)
+        key = f"packed-{engine}{'-unflatten' if unflatten else ''}"
+        render = partial(
+            _render_packed,
+            components,
+            title,
+            extension,
+            layout_processes,
+            engine,
+            unflatten,
+            render_dot,
+            render_config,
+        )
+    else:
+        if engine == "auto":
+            engine = choose_engine(len(tables), len(relationships))
+        dot_file = _intermediary_to_dot(
+            tables, relationships, title, engine, unflatten, render_config
+        )
+        key = engine
+        render = partial(render_dot, dot_file, engine, extension)
+    return dot_file, key, render
+
+
+def _render_dot(dot_file, engine, extension):
+    """Returns the image of the dot source laid out by the graphviz engine."""
+    binding = _graphviz()
+    if binding.__name__ == "pygraphviz":
+        graph = binding.AGraph()
         graph = graph.from_string(dot_file)
-        return graph.draw(prog="dot", format=extension)
+        return graph.draw(prog=engine, format=extension)
+    elif engine == "nop2":
+        # the graphviz package only knows the layout engines, nop2 is neato -n2
+        graph = binding.Source(dot_file, engine="neato")
+        return graph.pipe(format=extension, neato_no_op=2)
     else:
-        graph = Source(dot_file, engine="dot")
+        graph = binding.Source(dot_file, engine=engine)
         return graph.pipe(format=extension)
 
 
+def _layout_dot(dot_file, engine="dot"):
+    """Returns the dot source with the positions computed by the graphviz engine."""
+    return _render_dot(dot_file, engine, "dot").decode()
+
+
+def _render_packed(
+    components, title, extension, processes, engine, unflatten, render_dot, render_config
+):
+    """Returns the image of the components laid out in parallel and packed together."""
+    sources = []
+    engines = []
+    for tables, relationships in components:
+        component_engine = engine
+        if engine == "auto":
+            component_engine = choose_engine(len(tables), len(relationships))
+        sources.append(
+            _intermediary_to_dot(
+                tables, relationships, "", component_engine, unflatten, render_config
+            )
+        )
+        engines.append(component_engine)
+    layouts = layout_components(sources, engines, _layout_dot, processes or None)
+    graph_attributes = f'label="{title}"\nlabelloc=t' if title else ""
+    return render_dot(pack_layouts(layouts, graph_attributes), "nop2", extension)
+
+
+@lru_cache(maxsize=1)
+def _graphviz():
+    """Returns the graphviz binding, pygraphviz or else graphviz, None if neither is installed.
+
+    The binding is imported on the first graph rendered.
+    """
+    try:
+        import pygraphviz
+
+        logging.debug("using pygraphviz")
+        return pygraphviz
+    except ImportError:
+        pass
+    try:
+        import graphviz
+
+        logging.debug("using graphviz")
+        return graphviz
+    except ImportError:
+        logging.error("either pygraphviz or graphviz should be installed")
+        return None
+
+
+@lru_cache(maxsize=1)
+def _graphviz_version():
+    """Returns the version of graphviz used to render the images, with the binding using it."""
+    binding = _graphviz()
+    if binding.__name__ == "pygraphviz":
+        numbers = (
+            binding.graphviz.GRAPHVIZ_MAJOR_VERSION,
+            binding.graphviz.GRAPHVIZ_MINOR_VERSION,
+            binding.graphviz.GRAPHVIZ_PATCH_VERSION,
+        )
+        return "pygraphviz-" + ".".join(map(str, numbers))
+    return "graphviz-" + ".".join(map(str, binding.version()))
+
+
 def intermediary_to_puml(tables, relationships, output, title=""):
     """Saves the intermediary representation to PlantUML."""
-    puml_markup = _intermediary_to_puml(tables, relationships)
-    puml_markup = "\n".join(
-        (
-            "left to right direction",
-            f"title {title}\n {puml_markup}" if title else "",
-            puml_markup,
-        )
-    )
-    markup_encoded = plantuml_convert(puml_markup)
-    puml_markup += (
-        f"\nfooter [[https://www.plantuml.com/plantuml/svg/{markup_encoded}"
-        "{link to PlantUML server} Link to PlantUML server]]"
+    return "".join(emit_puml(tables, relationships, output, title)).encode()
+
+
+# The emitters yield the text of the outputs chunk by chunk, so that it can be written to a file
+# without being built in memory. The tables and relationships may be iterated several times.
+
+
+def emit_markdown(tables, relationships, title="", render_config=None):
+    """Yields the markdown of the intermediary representation."""
+    if title:
+        yield (config if render_config is None else render_config)["MARKDOWN_TITLE"].format(title)
+        yield "\n"
+    yield from _iter_markdown(tables, relationships)
+
+
+def emit_mermaid(tables, relationships, title=""):
+    """Yields the markdown embedding the Mermaid-JS class diagram."""
+    return _emit_mermaid_markdown(_iter_mermaid, tables, relationships, title)
+
+
+def emit_mermaid_er(tables, relationships, title=""):
+    """Yields the markdown embedding the Mermaid-JS ER diagram."""
+    return _emit_mermaid_markdown(_iter_mermaid_er, tables, relationships, title)
+
+
+def emit_dot(tables, relationships, title="", engine="dot", unflatten=False, render_config=None):
+    """Yields the dot source representing the database.
+
+    The graph attributes needed by the graphviz engine are added, see `ENGINE_GRAPH_ATTRIBUTES`.
+    With unflatten, the relations and the tables are spread over more ranks, see `layout.unflatten`.
+    The render_config (a `cst.RenderConfig`) defaults to the global `cst.config`.
+    """
+    dot_config = config if render_config is None else render_config
+    templates = dot_templates(dot_config)
+    if title:
+        yield f"""{dot_config["DOT_GRAPH_BEGINNING"]}
+         label="{title}"
+         labelloc=t\n"""
+    else:
+        yield dot_config["DOT_GRAPH_BEGINNING"]
+    if engine in ENGINE_GRAPH_ATTRIBUTES:
+        yield f"\n    graph [{ENGINE_GRAPH_ATTRIBUTES[engine]}];"
+    minlens, chains = unflatten_graph(tables, relationships) if unflatten else ({}, [])
+    yield "\n"
+    yield from _join_lines(t.to_dot(templates) for t in tables)
+    yield "\n"
+    yield from _join_lines(
+        r.to_dot(templates, (f"minlen={minlens[i]}",) if i in minlens else ())
+        for i, r in enumerate(relationships)
     )
+    for left, right in chains:
+        yield f'\n"{left}" {templates.edge} "{right}" [style=invis];'
+    yield "\n}"
+
+
+def emit_puml(tables, relationships, output, title=""):
+    """Yields the PlantUML representation."""
+
+    def markup():
+        yield "left to right direction\n"
+        if title:
+            yield f"title {title}\n "
+            yield from _iter_puml(tables, relationships)
+        yield "\n"
+        yield from _iter_puml(tables, relationships)
+
+    yield "@startuml\n"
+    yield from markup()
+    yield "\nfooter [[https://www.plantuml.com/plantuml/svg/"
+    yield from iter_plantuml_convert(markup())
+    yield "{link to PlantUML server} Link to PlantUML server]]\n@enduml"
+
+
+def _emit_mermaid_markdown(iter_markup, tables, relationships, title):
+    """Yields the Mermaid-JS markup in a markdown comment followed by the link to its image."""
+
+    def markup():
+        if title:
+            yield f"---\ntitle: {title}\n---\n"
+        yield from iter_markup(tables, relationships)
+        if title:
+            yield "\n"
 
-    puml_markup = f"@startuml\n{puml_markup}\n@enduml"
-    return puml_markup.encode()
+    yield "<!--\n\n"
+    yield from markup()
+    yield "\n\n-->\n![](https://mermaid.ink/img/"
+    encoded = iter_base64((chunk.encode("utf8") for chunk in markup()), base64.urlsafe_b64encode)
+    for chunk in encoded:
+        yield chunk.decode("ascii")
+    yield ")\n"
+
+
+def _join_lines(lines):
+    """Yields the lines separated by new lines, without building the joined string."""
+    for i, line in enumerate(lines):
+        if i:
+            yield "\n"
+        yield line
+
+
+def _iter_markdown(tables, relationships):
+    yield from _join_lines(t.to_markdown() for t in tables)
+    yield "\n"
+    yield from _join_lines(r.to_markdown() for r in relationships)
+
+
+def _iter_mermaid(tables, relationships):
+    yield "classDiagram\n"
+    yield from _join_lines(t.to_mermaid() for t in tables)
+    yield "\n"
+    yield from _join_lines(r.to_mermaid() for r in relationships)
+
+
+def _iter_mermaid_er(tables, relationships):
+    yield "erDiagram\n"
+    yield from _join_lines(t.to_mermaid_er() for t in tables)
+    yield "\n"
+    yield from _join_lines(r.to_mermaid_er() for r in relationships)
+
+
+def _iter_puml(tables, relationships):
+    yield from _join_lines(t.to_puml() for t in tables)
+    yield "\n"
+    yield from _join_lines(r.to_puml() for r in relationships)
 
 
 def _intermediary_to_markdown(tables, relationships):
     """Returns the er markup source in a string."""
-    t = "\n".join(t.to_markdown() for t in tables)
-    r = "\n".join(r.to_markdown() for r in relationships)
-    return f"{t}\n{r}"
+    return "".join(_iter_markdown(tables, relationships))
 
 
 def _intermediary_to_mermaid(tables, relationships):
     """Returns the er markup source in a string."""
-    t = "\n".join(t.to_mermaid() for t in tables)
-    r = "\n".join(r.to_mermaid() for r in relationships)
-    return f"classDiagram\n{t}\n{r}"
+    return "".join(_iter_mermaid(tables, relationships))
 
 
 def _intermediary_to_mermaid_er(tables, relationships):
     """Returns the er markup source in a string."""
-    t = "\n".join(t.to_mermaid_er() for t in tables)
-    r = "\n".join(r.to_mermaid_er() for r in relationships)
-    return f"erDiagram\n{t}\n{r}"
+    return "".join(_iter_mermaid_er(tables, relationships))
 
 
-def _intermediary_to_dot(tables, relationships, title=""):
+def _intermediary_to_dot(
+    tables, relationships, title="", engine="dot", unflatten=False, render_config=None
+):
     """Returns the dot source representing the database in a string."""
-    t = "\n".join(t.to_dot() for t in tables)
-    r = "\n".join(r.to_dot() for r in relationships)
-
-    graph_config = (
-        f"""{config["DOT_GRAPH_BEGINNING"]}
-         label="{title}"
-         labelloc=t\n"""
-        if title
-        else config["DOT_GRAPH_BEGINNING"]
-    )
-    return f"{graph_config}\n{t}\n{r}\n}}"
+    return "".join(emit_dot(tables, relationships, title, engine, unflatten, render_config))
 
 
 def _intermediary_to_puml(tables, relationships):
     """Returns the er markup source in a string."""
-    t = "\n".join(t.to_puml() for t in tables)
-    r = "\n".join(r.to_puml() for r in relationships)
-    return f"{t}\n{r}"
+    return "".join(_iter_puml(tables, relationships))
 
 
-# Routes from the class name to the function transforming this class in
-# the intermediary representation.
+# Routes from the class name to the name of the function of the sqla module transforming
+# this class in the intermediary representation.
 switch_input_class_to_method = {
-    "MetaData": metadata_to_intermediary,
-    "DeclarativeMeta": declarative_to_intermediary,
+    "MetaData": "metadata_to_intermediary",
+    "DeclarativeMeta": "declarative_to_intermediary",
     # For compatibility with Flask-SQLAlchemy
-    "_BoundDeclarativeMeta": declarative_to_intermediary,
+    "_BoundDeclarativeMeta": "declarative_to_intermediary",
     # Renamed in Flask-SQLAlchemy 2.3
-    "DefaultMeta": declarative_to_intermediary,
-    "DeclarativeAttributeIntercept": declarative_to_intermediary,
+    "DefaultMeta": "declarative_to_intermediary",
+    "DeclarativeAttributeIntercept": "declarative_to_intermediary",
 }
 
 # Routes from the mode to the method to transform the intermediary
@@ -273,33 +678,58 @@ switch_output_mode = {
     "puml": intermediary_to_puml,
 }
 
+# Routes from the method transforming the intermediary representation to the
+# emitter yielding the same output chunk by chunk, for the text outputs.
+switch_output_emitter = {
+    intermediary_to_markdown: emit_markdown,
+    intermediary_to_mermaid: emit_mermaid,
+    intermediary_to_mermaid_er: emit_mermaid_er,
+    intermediary_to_dot: emit_dot,
+    intermediary_to_puml: emit_puml,
+}
+
 
-def all_to_intermediary(filename_or_input, schema=None):
+def all_to_intermediary(filename_or_input, schema=None, cache_dir=None):
     """Dispatch the filename_or_input to the different function to produce the intermediary syntax.
 
     All the supported classes names are in `switch_input_class_to_method`.
-    The input can also be a list of strings in markdown format or a filename finishing by '.er' containing markdown
-    format.
+    The input can also be a list of strings in markdown format, an iterator of such strings (like an open
+    file), a filename finishing by '.er' containing markdown format or '-' to read the markdown from stdin.
+    The markdown files are cached in cache_dir (defaults to $ERALCHEMY_CACHE_DIR) if it is set.
     """
     # Try to convert from the name of the class
     input_class_name = filename_or_input.__class__.__name__
-    try:
-        this_to_intermediary = switch_input_class_to_method[input_class_name]
-        tables, relationships = this_to_intermediary(filename_or_input)
-        return tables, relationships
-    except KeyError:
-        pass
+    if input_class_name in switch_input_class_to_method:
+        from . import sqla
+
+        this_to_intermediary = getattr(sqla, switch_input_class_to_method[input_class_name])
+        return this_to_intermediary(filename_or_input)
 
     # try to read markdown file.
     if isinstance(filename_or_input, str):
+        if filename_or_input == "-":
+            return line_iterator_to_intermediary(sys.stdin)
         if filename_or_input.split(".")[-1] == "er":
+            from .cache import cached_markdown_file_to_intermediary, get_cache
+
+            cache = get_cache(cache_dir)
+            if cache is not None:
+                return cached_markdown_file_to_intermediary(filename_or_input, cache, _version())
             return markdown_file_to_intermediary(filename_or_input)
 
     # try to read a markdown in a string
     if not isinstance(filename_or_input, str):
+        # lazy iterators (open files, generators) can only be consumed once
+        if isinstance(filename_or_input, Iterator):
+            return line_iterator_to_intermediary(filename_or_input)
         if all(isinstance(e, str) for e in filename_or_input):
             return line_iterator_to_intermediary(filename_or_input)
 
+    from sqlalchemy.engine.url import make_url
+    from sqlalchemy.exc import ArgumentError
+
+    from .sqla import database_to_intermediary
+
     # try to read DB URI might raise ArgumentError.
     try:
         make_url(filename_or_input)
@@ -334,6 +764,8 @@ def filter_resources(
     exclude_tables=None,
     exclude_columns=None,
     sort_mode="alphabetical",
+    focus=None,
+    depth=None,
 ):
     """Filter the resources.
 
@@ -346,57 +778,183 @@ def filter_resources(
     Disclosure note:
         All relationships are taken into consideration before ignoring columns.
         In other words, if one excludes primary or foreign keys, it will still keep the relations display amongst tables.
+    Focus:
+        Only the tables at most depth relations away from the tables present in focus (lst of str, tables names)
+        are kept, before applying the other filters. depth defaults to 1 and can only be given with focus,
+        a focus matching no table raises a ValueError.
+
+    The tables can also be given as `ColumnarTables`, which are then filtered with masks
+    computed once per distinct name.
+
+    The tables and relationships are not copied: the tables kept with all their columns in
+    order are returned as is, the other ones are shallow copies sharing the columns objects.
     """
-    _tables = copy.deepcopy(tables)
-    _relationships = copy.deepcopy(relationships)
+    if isinstance(tables, ColumnarTables):
+        table_names = tables.table_names
+        column_names = tables.column_names
+    else:
+        table_names = [t.name for t in tables]
+        column_names = [c.name for t in tables for c in t.columns]
 
-    include_tables_re = re.compile(
-        "|".join(f"({name})" for name in (include_tables or [t.name for t in _tables])),
+    # without include list, everything present in the schema is included
+    include_table = (
+        NamePatterns(include_tables) if include_tables else set(table_names).__contains__
     )
-    include_columns_re = re.compile(
-        "|".join(
-            f"({name})"
-            for name in (include_columns or [c.name for t in _tables for c in t.columns])
-        ),
-    )
-    exclude_tables_re = re.compile(
-        "|".join(f"({name})" for name in (exclude_tables or [])),
-    )
-    exclude_columns_re = re.compile(
-        "|".join(f"({name})" for name in (exclude_columns or [])),
+    include_column = (
+        NamePatterns(include_columns) if include_columns else set(column_names).__contains__
     )
+    exclude_table = NamePatterns(exclude_tables or [])
+    exclude_column = NamePatterns(exclude_columns or [])
+
+    if depth is not None and not focus:
+        raise ValueError("depth is only used with focus")
+    if depth is None:
+        depth = 1
+    if depth < 0:
+        raise ValueError(f"depth must be positive or 0, got {depth}")
+    focused = None
+    if focus:
+        focus_table = NamePatterns(focus)
+        seeds = [name for name in table_names if focus_table(name)]
+        if not seeds:
+            raise ValueError(f"no table matches the focus {', '.join(focus)}")
+        focused = neighborhood(relationships, seeds, depth)
 
     def check_table(name):
-        return not exclude_tables_re.fullmatch(name) and include_tables_re.fullmatch(
-            name,
+        return (
+            not exclude_table(name) and include_table(name) and (focused is None or name in focused)
         )
 
-    _tables = [t for t in _tables if check_table(t.name)]
     _relationships = [
-        r
-        for r in _relationships
-        if not exclude_tables_re.fullmatch(r.right_table)
-        and not exclude_tables_re.fullmatch(r.left_table)
-        and include_tables_re.fullmatch(r.right_table)
-        and include_tables_re.fullmatch(r.left_table)
+        r for r in relationships if check_table(r.right_table) and check_table(r.left_table)
     ]
 
     def check_column(name):
-        return not exclude_columns_re.fullmatch(name) and include_columns_re.fullmatch(
-            name,
-        )
+        return not exclude_column(name) and include_column(name)
+
+    if isinstance(tables, ColumnarTables):
+        return tables.filter(check_table, check_column, sort_mode), _relationships
 
     # default sort mode 'alphabetical' is implemented in Column class (__eq__ method)
     sort_func = original_order_keys_first if sort_mode == "original" else None
-    for t in _tables:
-        t.columns = sorted([c for c in t.columns if check_column(c.name)], key=sort_func)
+    _tables = []
+    for t in tables:
+        if not check_table(t.name):
+            continue
+        columns = sorted([c for c in t.columns if check_column(c.name)], key=sort_func)
+        if len(columns) == len(t.columns) and all(map(operator.is_, columns, t.columns)):
+            _tables.append(t)
+        else:
+            _tables.append(Table(name=t.name, columns=columns))
 
     return _tables, _relationships
 
 
+def render_intermediary(
+    tables,
+    relationships,
+    output: str | IO[bytes] | None,
+    mode="auto",
+    include_tables=None,
+    include_columns=None,
+    exclude_tables=None,
+    exclude_columns=None,
+    title=None,
+    sort_mode="alphabetical",
+    focus=None,
+    depth=None,
+    cache_dir=None,
+    layout_processes=None,
+    engine="dot",
+    unflatten=False,
+    layout_timeout=None,
+    render_pool=None,
+    render_config=None,
+):
+    """Filter the intermediary representation and render it to the output.
+
+    See `render_er` for the description of the parameters.
+    """
+    tables, relationships = filter_resources(
+        tables,
+        relationships,
+        include_tables=include_tables,
+        include_columns=include_columns,
+        exclude_tables=exclude_tables,
+        exclude_columns=exclude_columns,
+        sort_mode=sort_mode,
+        focus=focus,
+        depth=depth,
+    )
+    return _render_output(
+        tables,
+        relationships,
+        output,
+        mode,
+        title,
+        render_config,
+        cache_dir=cache_dir,
+        layout_processes=layout_processes,
+        engine=engine,
+        unflatten=unflatten,
+        layout_timeout=layout_timeout,
+        render_pool=render_pool,
+    )
+
+
+def _render_output(tables, relationships, output, mode, title, render_config=None, **graph_options):
+    """Renders the filtered intermediary representation to the output.
+
+    The graph_options are passed to `intermediary_to_schema` for the graph outputs.
+    """
+    intermediary_to_output = _output_function(
+        output if isinstance(output, str) else None, mode, render_config, **graph_options
+    )
+    if output is None:
+        return intermediary_to_output(tables, relationships, title)
+    if isinstance(output, str):
+        with open(output, "wb") as file_out:
+            _write_output(intermediary_to_output, tables, relationships, title, file_out)
+    else:
+        _write_output(intermediary_to_output, tables, relationships, title, output)
+    return None
+
+
+def _output_function(output: str | None, mode: str, render_config=None, **graph_options):
+    """Returns the function of `get_output_mode`, with the graph_options for the graph outputs.
+
+    The render_config is given to the outputs using the config.
+    """
+    intermediary_to_output = get_output_mode(output, mode)
+    function = getattr(intermediary_to_output, "func", intermediary_to_output)
+    if function is intermediary_to_schema:
+        intermediary_to_output = partial(
+            intermediary_to_output, render_config=render_config, **graph_options
+        )
+    elif render_config is not None and function in (intermediary_to_markdown, intermediary_to_dot):
+        intermediary_to_output = partial(intermediary_to_output, render_config=render_config)
+    return intermediary_to_output
+
+
+def _write_output(intermediary_to_output, tables, relationships, title, sink):
+    """Writes the output to the binary sink, incrementally for the text outputs."""
+    emit = switch_output_emitter.get(
+        getattr(intermediary_to_output, "func", intermediary_to_output)
+    )
+    if emit is None:
+        # graphviz does not yet support printing to stdout
+        # but writes directly to the output file
+        # https://github.com/xflr6/graphviz/pull/234
+        sink.write(intermediary_to_output(tables, relationships, title))
+    else:
+        # the emitters take the same keyword arguments as their function
+        keywords = getattr(intermediary_to_output, "keywords", {})
+        write_chunks(emit(tables, relationships, title, **keywords), sink)
+
+
 def render_er(
     input,
-    output: str | None,
+    output: str | IO[bytes] | None,
     mode="auto",
     include_tables=None,
     include_columns=None,
@@ -405,13 +963,24 @@ def render_er(
     schema=None,
     title=None,
     sort_mode="alphabetical",
+    cache_dir=None,
+    focus=None,
+    depth=None,
+    layout_processes=None,
+    engine="dot",
+    unflatten=False,
+    layout_timeout=None,
+    render_pool=None,
+    render_config=None,
 ):
     """Transform the metadata into a representation.
 
     :param input: Possible inputs are instances of:
         MetaData: SQLAlchemy Metadata
         DeclarativeMeta: SQLAlchemy declarative Base
-    :param output: name of the file to output the rendered graph to.
+    :param output: name of the file to output the rendered graph to,
+        or binary file object (like sys.stdout.buffer) the text outputs are written to incrementally,
+        the mode must then be set.
         Returns text as str if set to None
     :param mode: str in list:
         'er': writes to a file the markup to generate an ER style diagram.
@@ -433,9 +1002,81 @@ def render_er(
     :param sort_mode: str, sorting mode for the key columns (first) and non-key columns (second):
         'alphabetical': key and non-key columns are sorted by name in alphabetical order (default).
         'original': key and non-key columns are kept in the order, in which they were defined.
+    :param cache_dir: directory caching the intermediary of the markdown files and the images,
+        defaults to the ERALCHEMY_CACHE_DIR environment variable, no caching if unset.
+    :param focus: lst of str, table names around which the graph is rendered, None means all tables
+    :param depth: int, maximal number of relations between the focus and the rendered tables,
+        1 if None, only given with focus.
+    :param layout_processes: int, number of processes laying out in parallel the groups of tables
+        not connected by any relation (all the cores if 0) for the graph outputs,
+        None lays out the whole graph at once.
+    :param engine: str, graphviz engine laying out the graph outputs, 'auto' chooses dot or sfdp
+        from the number of tables and relations.
+    :param unflatten: bool, spread the wide graphs laid out by dot over more ranks.
+    :param layout_timeout: float, seconds after which the layout of the graph outputs is stopped
+        and a cheaper one tried: faster engine, then key columns only, then tables only.
+    :param render_pool: RenderPool, workers rendering the graph outputs, reused across the calls
+        to save the start of graphviz for each image.
+    :param render_config: RenderConfig, config of the dot and er outputs and of the graphs,
+        defaults to the global `cst.config`. Renders with different configs can run in threads.
     """
-    try:
-        tables, relationships = all_to_intermediary(input, schema=schema)
+    with _print_render_errors():
+        tables, relationships = all_to_intermediary(input, schema=schema, cache_dir=cache_dir)
+        return render_intermediary(
+            tables,
+            relationships,
+            output,
+            mode,
+            include_tables=include_tables,
+            include_columns=include_columns,
+            exclude_tables=exclude_tables,
+            exclude_columns=exclude_columns,
+            title=title,
+            sort_mode=sort_mode,
+            focus=focus,
+            depth=depth,
+            cache_dir=cache_dir,
+            layout_processes=layout_processes,
+            engine=engine,
+            unflatten=unflatten,
+            layout_timeout=layout_timeout,
+            render_pool=render_pool,
+            render_config=render_config,
+        )
+
+
+def render_many(
+    input,
+    outputs: list[str],
+    include_tables=None,
+    include_columns=None,
+    exclude_tables=None,
+    exclude_columns=None,
+    schema=None,
+    title=None,
+    sort_mode="alphabetical",
+    cache_dir=None,
+    focus=None,
+    depth=None,
+    layout_processes=None,
+    engine="dot",
+    unflatten=False,
+    layout_timeout=None,
+    render_pool=None,
+    render_config=None,
+) -> None:
+    """Transform the metadata into several representations, introspecting and filtering it once.
+
+    :param outputs: lst of str, names of the files to write, the mode of each output is chosen
+        from its extension like the 'auto' mode of `render_er`.
+
+    See `render_er` for the description of the other parameters.
+    """
+    with _print_render_errors():
+        # checks all the outputs before the introspection
+        for output in outputs:
+            get_output_mode(output, "auto")
+        tables, relationships = all_to_intermediary(input, schema=schema, cache_dir=cache_dir)
         tables, relationships = filter_resources(
             tables,
             relationships,
@@ -444,20 +1085,39 @@ def render_er(
             exclude_tables=exclude_tables,
             exclude_columns=exclude_columns,
             sort_mode=sort_mode,
+            focus=focus,
+            depth=depth,
         )
-        intermediary_to_output = get_output_mode(output, mode)
-        text = intermediary_to_output(tables, relationships, title)
-        # graphviz does not yet support printing to stdout
-        # but writes directly to the output file
-        # https://github.com/xflr6/graphviz/pull/234
-        if output is None:
-            return text
-        with open(output, "wb") as file_out:
-            file_out.write(text)
+        if isinstance(tables, ColumnarTables):
+            # the tables would be built again for each output
+            tables = tables.to_tables()
+        for output in outputs:
+            _render_output(
+                tables,
+                relationships,
+                output,
+                "auto",
+                title,
+                render_config,
+                cache_dir=cache_dir,
+                layout_processes=layout_processes,
+                engine=engine,
+                unflatten=unflatten,
+                layout_timeout=layout_timeout,
+                render_pool=render_pool,
+            )
+
+
+@contextmanager
+def _print_render_errors():
+    """Prints the errors of the rendering to stderr instead of raising them."""
+    try:
+        yield
     except ImportError as e:
         module_name = str(e).split()[-1]
         print(f'Please install {module_name} using "pip install {module_name}".', file=sys.stderr)
-    except (FileNotFoundError, ValueError) as e:
+    except (OSError, ValueError) as e:
+        # OSError includes the LayoutTimeoutError
         print(f"rendering failed: {e}", file=sys.stderr)
     except ParsingException as e:
         print(f"render failed: {e}", file=sys.stderr)
@@ -7,7 +7,10 @@ from __future__ import annotations
 
 import operator
 import re
+import sys
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Mapping
+from functools import lru_cache
 from typing import ClassVar
 
 from .cst import config
@@ -16,57 +19,179 @@ from .cst import config
 class Drawable(ABC):
     """Abstract class to represent all the objects which are drawable."""
 
+    __slots__: tuple[str, ...] = ()
     RE: ClassVar[re.Pattern[str]]
 
     def to_markdown(self) -> str:
         """Transforms the intermediary object to its syntax in the er markup."""
         raise NotImplementedError()
 
-    def to_dot(self) -> str:
-        """Transforms the intermediary object to its syntax in the dot format."""
+    def to_dot(self, templates: DotTemplates | None = None) -> str:
+        """Transforms the intermediary object to its syntax in the dot format.
+
+        :param templates: dot templates compiled from the config, compiled on the fly if None.
+        """
         raise NotImplementedError()
 
     def to_puml(self) -> str:
         """Transforms the intermediary object to it's syntax in the PlantUML format."""
         raise NotImplementedError()
 
+    @property
+    def fields(self) -> tuple:
+        """Values of all the attributes of the object, in the order of `__slots__`."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
     def __eq__(self, other) -> bool:
-        return self.__dict__ == other.__dict__
+        if other.__class__ is not self.__class__:
+            return False
+        return self.fields == other.fields
+
+    @classmethod
+    def make_from_match(cls, match: re.Match) -> Drawable:
+        """Used in the parsing of files. Transforms a regex match to a Drawable object."""
+        return cls.make_from_groups(match.groupdict())
 
     @staticmethod
     @abstractmethod
-    def make_from_match(match: re.Match) -> Drawable:
-        """Used in the parsing of files. Transforms a regex match to a Drawable object."""
+    def make_from_groups(groups: dict[str, str | None]) -> Drawable:
+        """Transforms the named groups of a regex match to a Drawable object."""
 
     def __str__(self) -> str:
         return self.to_markdown()
 
 
-def sanitize_mermaid(text: str, *, is_er: bool = False):
-    RE = re.compile("[^0-9a-zA-Z_-]+")
-    """Mermaid does not allow special characters in column names"""
+MERMAID_FORBIDDEN_CHARS = re.compile("[^0-9a-zA-Z_-]+")
+# names repeat a lot across the relations, each distinct name is sanitized once
+SANITIZE_CACHE_SIZE = 2**17
+
+
+def sanitize_mermaid(text: str, *, is_er: bool = False) -> str:
+    """Mermaid does not allow special characters in column names."""
     if not text:
         return text
     if is_er and (text[0].isdigit() or text[0] == "-"):
         # mermaid ER does not allow leading dash or digits in column names
         text = "_" + text
-    return re.sub(RE, "_", text)
+    return MERMAID_FORBIDDEN_CHARS.sub("_", text)
+
+
+def _memoize_sanitizer(sanitizer: Callable[..., str]) -> Callable[[str, bool], str]:
+    @lru_cache(maxsize=SANITIZE_CACHE_SIZE)
+    def sanitize(text: str, is_er: bool) -> str:
+        return sanitizer(text, is_er=is_er)
+
+    return sanitize
+
+
+_sanitize_name = _memoize_sanitizer(sanitize_mermaid)
+
+
+def set_name_sanitizer(sanitizer: Callable[..., str] | None = None) -> None:
+    """Set the function sanitizing the names in the mermaid, ER and PlantUML outputs.
+
+    The sanitizer is called as `sanitizer(name, is_er=...)` and its results are memoized.
+    Passing None restores `sanitize_mermaid`.
+    """
+    global _sanitize_name
+    _sanitize_name = _memoize_sanitizer(sanitizer or sanitize_mermaid)
+
+
+def sanitize_name(text: str, *, is_er: bool = False) -> str:
+    """Sanitize the name with the sanitizer set by `set_name_sanitizer`."""
+    return _sanitize_name(text, is_er)
+
+
+# placeholders of the values of a column while compiling the dot row templates
+_DOT_ROW_VALUES = ("\x00name\x00", "\x00type\x00", "\x00null\x00")
+_DOT_ROW_VALUES_RE = re.compile("|".join(map(re.escape, _DOT_ROW_VALUES)))
+
+
+def _compile_dot_row(
+    row_config: Mapping[str, str],
+    is_key: int,
+    typed: int,
+    has_port: int,
+) -> Callable[[str, str | None, str], str]:
+    """Compile the dot row of a column to a function of its name, type and nullability."""
+    name, type, null = _DOT_ROW_VALUES
+    base = row_config["DOT_ROW_TAGS"].format(
+        ' ALIGN="LEFT" {port}',
+        "{key_opening}{col_name}{key_closing} {type}{null}",
+    )
+    row = base.format(
+        port=f'PORT="{name}"' if has_port else "",
+        key_opening=row_config["DOT_KEY_OPENING"] if is_key else "",
+        key_closing=row_config["DOT_KEY_CLOSING"] if is_key else "",
+        col_name=row_config["DOT_FONT_TAGS"].format(name),
+        type=row_config["DOT_FONT_TAGS"].format(f" [{type}]") if typed else "",
+        null=null,
+    )
+    # the row is turned to a printf-style template, which is the fastest to fill
+    indexes = [_DOT_ROW_VALUES.index(m) for m in _DOT_ROW_VALUES_RE.findall(row)]
+    template = "%s".join(part.replace("%", "%%") for part in _DOT_ROW_VALUES_RE.split(row))
+    if not indexes:
+        return lambda name, type, null: template
+    pick = operator.itemgetter(*indexes)
+    if len(indexes) == 1:
+        return lambda name, type, null: template % (pick((name, type, null)),)
+    return lambda name, type, null: template % pick((name, type, null))
+
+
+class DotTemplates:
+    """Dot templates compiled once from a snapshot of the config and reused for every object."""
+
+    def __init__(self, dot_config: Mapping[str, str]) -> None:
+        # indexed by is_key, then by whether the column has a type, then a name
+        self.rows = tuple(
+            tuple(
+                tuple(_compile_dot_row(dot_config, is_key, typed, has_port) for has_port in (0, 1))
+                for typed in (0, 1)
+            )
+            for is_key in (0, 1)
+        )
+        self.row_tags = dot_config["DOT_ROW_TAGS"].format
+        self.table = dot_config["DOT_TABLE"].format
+        self.edge = "->" if dot_config["DOT_RELATION_GRAPH"] == "digraph" else "--"
+        self.crow = dot_config["DOT_RELATION_STYLE"] == "crow"
+
+    def column(self, column: Column) -> str:
+        name, type = column.name, column.type
+        row = self.rows[column.is_key][type is not None][name != ""]
+        return row(name, type, "" if column.is_null else " NOT NULL")
+
+    def header(self, name: str) -> str:
+        return self.row_tags("", f'<B><FONT POINT-SIZE="16">{name}</FONT></B>')
+
+
+@lru_cache(maxsize=16)
+def _compile_dot_templates(snapshot: tuple[tuple[str, str], ...]) -> DotTemplates:
+    return DotTemplates(dict(snapshot))
+
+
+def dot_templates(dot_config: Mapping[str, str] = config) -> DotTemplates:
+    """Returns the dot templates compiled for the current values of the config."""
+    return _compile_dot_templates(tuple(dot_config.items()))
 
 
 class Column(Drawable):
     """Represents a Column in the intermediaty syntax."""
 
+    __slots__ = ("name", "type", "is_key", "is_null", "is_foreign_key")
     RE = re.compile(
         r'(?P<primary>\*?)(?P<name>\w+(\s*\w+)*)\s*(\{label:\s*"(?P<label>[^"]+)"\})?',
     )
 
     @staticmethod
-    def make_from_match(match: re.Match) -> Column:
+    def make_from_groups(groups: dict[str, str | None]) -> Column:
+        primary = groups["primary"] or ""
+        label = groups["label"]
+        # the names and types repeat a lot across the tables
         return Column(
-            name=match.group("name"),
-            type=match.group("label"),
-            is_key="*" in match.group("primary"),
-            is_null="*" not in match.group("primary"),
+            name=sys.intern(groups["name"] or ""),
+            type=sys.intern(label) if label is not None else None,
+            is_key="*" in primary,
+            is_null="*" not in primary,
         )
 
     def __init__(
@@ -103,7 +228,7 @@ class Column(Drawable):
         return "*" if self.is_key else ""
 
     def to_markdown(self) -> str:
-        name = sanitize_mermaid(self.name)
+        name = sanitize_name(self.name)
         return f'    {self.key_symbol}{name} {{label:"{self.type}"}}'
 
     def to_mermaid(self) -> str:
@@ -116,7 +241,7 @@ class Column(Drawable):
 
     def to_mermaid_er(self) -> str:
         type_str = self.type.replace(" ", "_")
-        name = sanitize_mermaid(self.name, is_er=True)
+        name = sanitize_name(self.name, is_er=True)
         attributes = []
         if self.is_key:
             attributes.append("PK")
@@ -125,23 +250,8 @@ class Column(Drawable):
         attributes_str = f"{', '.join(attributes)}" if attributes else ""
         return f" {type_str} {name} {attributes_str}"
 
-    def to_dot(self) -> str:
-        base = config["DOT_ROW_TAGS"].format(
-            ' ALIGN="LEFT" {port}',
-            "{key_opening}{col_name}{key_closing} {type}{null}",
-        )
-        KO = config["DOT_KEY_OPENING"]
-        KC = config["DOT_KEY_CLOSING"]
-        return base.format(
-            port=f'PORT="{self.name}"' if self.name else "",
-            key_opening=KO if self.is_key else "",
-            key_closing=KC if self.is_key else "",
-            col_name=config["DOT_FONT_TAGS"].format(self.name),
-            type=(
-                config["DOT_FONT_TAGS"].format(f" [{self.type}]") if self.type is not None else ""
-            ),
-            null=" NOT NULL" if not self.is_null else "",
-        )
+    def to_dot(self, templates: DotTemplates | None = None) -> str:
+        return (templates or dot_templates()).column(self)
 
     def to_puml(self) -> str:
         return " {} {} : {}{}{}".format(
@@ -153,9 +263,64 @@ class Column(Drawable):
         )
 
 
-class Relation(Drawable):
+class _KeyedDrawable(Drawable):
+    """Drawable with an identity key computed on first use and cached.
+
+    The key and its hash are reset when one of the attributes of `__slots__` is assigned.
+    """
+
+    __slots__ = ("_key", "_key_hash")
+    _key: tuple | None
+    _key_hash: int
+
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        if name[0] != "_":
+            object.__setattr__(self, "_key", None)
+
+    @property
+    def key(self) -> tuple:
+        """Identity of the object, computed by `_compute_key` on first use."""
+        if self._key is None:
+            self._key = self._compute_key()
+            self._key_hash = hash(self._key)
+        return self._key
+
+    def _compute_key(self) -> tuple:
+        raise NotImplementedError()
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return False
+        key, other_key = self.key, other.key
+        # the hashes differ for almost all the different objects
+        return self._key_hash == other._key_hash and key == other_key
+
+    def __hash__(self) -> int:
+        return self._key_hash if self._key is not None else hash(self.key)
+
+    def reset_key(self) -> None:
+        """Resets the cached key, after the object was changed in place."""
+        self._key = None
+
+
+class Relation(_KeyedDrawable):
     """Represents a Relation in the intermediaty syntax."""
 
+    __slots__ = (
+        "right_table",
+        "right_column",
+        "left_table",
+        "left_column",
+        "right_cardinality",
+        "left_cardinality",
+    )
+    right_table: str
+    right_column: str
+    left_table: str
+    left_column: str
+    right_cardinality: str
+    left_cardinality: str
     RE = re.compile(
         r"""
         (?P<left_table>[^\s]+?)
@@ -184,8 +349,8 @@ class Relation(Drawable):
     }
 
     @staticmethod
-    def make_from_match(match: re.Match) -> Relation:
-        return Relation(**match.groupdict())
+    def make_from_groups(groups: dict[str, str | None]) -> Relation:
+        return Relation(**groups)
 
     def __init__(
         self,
@@ -201,12 +366,15 @@ class Relation(Drawable):
             or left_cardinality not in self.cardinalities.keys()
         ):
             raise ValueError(f"Cardinality should be in {self.cardinalities.keys()}")
-        self.right_table = right_table
-        self.right_column = right_column or ""
-        self.left_table = left_table
-        self.left_column = left_column or ""
-        self.right_cardinality = right_cardinality
-        self.left_cardinality = left_cardinality
+        # set without resetting the key for each field
+        set_field = object.__setattr__
+        set_field(self, "right_table", right_table)
+        set_field(self, "right_column", right_column or "")
+        set_field(self, "left_table", left_table)
+        set_field(self, "left_column", left_column or "")
+        set_field(self, "right_cardinality", right_cardinality)
+        set_field(self, "left_cardinality", left_cardinality)
+        set_field(self, "_key", None)
 
     def to_markdown(self) -> str:
         return "{}{} {}--{} {}{}".format(
@@ -222,10 +390,10 @@ class Relation(Drawable):
         normalized = (
             Relation.cardinalities_mermaid.get(k, k)
             for k in (
-                sanitize_mermaid(self.left_table),
+                sanitize_name(self.left_table),
                 self.left_cardinality,
                 self.right_cardinality,
-                sanitize_mermaid(self.right_table),
+                sanitize_name(self.right_table),
             )
         )
         return '  {} "{}" -- "{}" {}'.format(*normalized)
@@ -234,8 +402,8 @@ class Relation(Drawable):
         left = Relation.cardinalities_crowfoot.get(self.left_cardinality, self.left_cardinality)
         right = Relation.cardinalities_crowfoot.get(self.right_cardinality, self.right_cardinality)
 
-        left_col = sanitize_mermaid(self.left_table, is_er=True)
-        right_col = sanitize_mermaid(self.right_table, is_er=True)
+        left_col = sanitize_name(self.left_table, is_er=True)
+        right_col = sanitize_name(self.right_table, is_er=True)
         return f"{left_col} {left}--{right} {right_col} : has"
 
     def graphviz_cardinalities(self, card) -> str:
@@ -256,28 +424,28 @@ class Relation(Drawable):
             raise ValueError(f"unknown cardinality: {card}")
         return head
 
-    def to_dot(self) -> str:
+    def to_dot(self, templates: DotTemplates | None = None, attributes: Iterable[str] = ()) -> str:
         if self.right_cardinality == self.left_cardinality == "":
             return ""
+        templates = templates or dot_templates()
         cards = []
-        edge = "--"
-        if config["DOT_RELATION_GRAPH"] == "digraph":
-            # digraph needs direction
-            # https://graphviz.org/doc/info/lang.html#lexical-and-semantic-notes
-            edge = "->"
-        if config["DOT_RELATION_STYLE"] == "crow":
+        # digraph needs direction
+        # https://graphviz.org/doc/info/lang.html#lexical-and-semantic-notes
+        edge = templates.edge
+        if templates.crow:
             if self.right_cardinality and self.left_cardinality:
                 cards.append('dir="both"')
         if self.left_cardinality != "":
-            if config["DOT_RELATION_STYLE"] == "crow":
+            if templates.crow:
                 cards.append("arrowhead" + self.graphviz_crow_arrowheads(self.left_cardinality))
             else:
                 cards.append("tail" + self.graphviz_cardinalities(self.left_cardinality))
         if self.right_cardinality != "":
-            if config["DOT_RELATION_STYLE"] == "crow":
+            if templates.crow:
                 cards.append("arrowtail" + self.graphviz_crow_arrowheads(self.right_cardinality))
             else:
                 cards.append("head" + self.graphviz_cardinalities(self.right_cardinality))
+        cards.extend(attributes)
         left_col = f':"{self.left_column}"' if self.left_column else ""
         right_col = f':"{self.right_column}"' if self.right_column else ""
         return f'"{self.left_table}"{left_col} {edge} "{self.right_table}"{right_col} [{",".join(cards)}];'
@@ -307,34 +475,37 @@ class Relation(Drawable):
             f" {self.right_table}{right_col}"
         )
 
-    def __eq__(self, other: object) -> bool:
-        if super().__eq__(other):
-            return True
-        if not isinstance(other, Relation):
-            return False
-        other_inversed = Relation(
-            right_table=other.left_table,
-            right_column=other.left_column,
-            left_table=other.right_table,
-            left_column=other.right_column,
-            right_cardinality=other.left_cardinality,
-            left_cardinality=other.right_cardinality,
+    def _compute_key(self) -> tuple[str, ...]:
+        """Identity of the relation, the same whichever direction the relation is declared in."""
+        direct = (
+            self.left_table,
+            self.left_column,
+            self.left_cardinality,
+            self.right_table,
+            self.right_column,
+            self.right_cardinality,
         )
-        return other_inversed.__dict__ == self.__dict__
+        return min(direct, direct[3:] + direct[:3])
 
 
-class Table(Drawable):
+class Table(_KeyedDrawable):
     """Represents a Table in the intermediaty syntax."""
 
+    __slots__ = ("name", "columns")
+    name: str
+    columns: list[Column]
     RE = re.compile(r"\[(?P<name>[^]]+)\]")
 
     def __init__(self, name: str, columns: list[Column]) -> None:
-        self.name = name
-        self.columns = columns
+        # set without resetting the key for each field
+        set_field = object.__setattr__
+        set_field(self, "name", name)
+        set_field(self, "columns", columns)
+        set_field(self, "_key", None)
 
     @staticmethod
-    def make_from_match(match: re.Match) -> Table:
-        return Table(name=match.group("name"), columns=[])
+    def make_from_groups(groups: dict[str, str | None]) -> Table:
+        return Table(name=groups["name"] or "", columns=[])
 
     @property
     def header_markdown(self) -> str:
@@ -345,12 +516,12 @@ class Table(Drawable):
 
     def to_mermaid(self) -> str:
         columns = [c.to_mermaid() for c in self.columns]
-        name = sanitize_mermaid(self.name)
+        name = sanitize_name(self.name)
         return f"  class {name}{{\n   " + "\n   ".join(columns) + "\n  }"
 
     def to_mermaid_er(self) -> str:
         columns = [c.to_mermaid_er() for c in self.columns]
-        name = sanitize_mermaid(self.name, is_er=True)
+        name = sanitize_name(self.name, is_er=True)
         return f"{name} {{\n" + "\n  ".join(columns) + "\n}"
 
     @property
@@ -359,26 +530,37 @@ class Table(Drawable):
 
     @property
     def header_dot(self) -> str:
-        return config["DOT_ROW_TAGS"].format("", f'<B><FONT POINT-SIZE="16">{self.name}</FONT></B>')
+        return dot_templates().header(self.name)
 
-    def to_dot(self) -> str:
-        body = "".join(c.to_dot() for c in self.columns)
-        return config["DOT_TABLE"].format(self.name, self.header_dot, body)
+    def to_dot(self, templates: DotTemplates | None = None) -> str:
+        templates = templates or dot_templates()
+        body = "".join(map(templates.column, self.columns))
+        return templates.table(self.name, templates.header(self.name), body)
 
     def to_puml(self) -> str:
         columns = [c.to_puml() for c in self.columns]
-        name = sanitize_mermaid(self.name)
+        name = sanitize_name(self.name)
         return f"entity  {name}{{\n" + "\n  ".join(columns) + "\n}"
 
     def __str__(self) -> str:
         return self.header_markdown
 
+    def _compute_key(self) -> tuple:
+        """Identity of the table, independent of the order of the columns.
+
+        The key is cached, the code changing the columns in place, like the parser, calls
+        `reset_key`.
+        """
+        return self.name, tuple(c.fields for c in self.columns_sorted)
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Table):
             return False
-        if other.name != self.name:
+        # cheap checks first, the keys are only computed when the tables could be equal
+        if other.name != self.name or len(other.columns) != len(self.columns):
             return False
+        return super().__eq__(other)
 
-        if self.columns_sorted != other.columns_sorted:
-            return False
-        return True
+    def __hash__(self) -> int:
+        # the columns are mutated while parsing and filtering, the name identifies the table
+        return hash(self.name)
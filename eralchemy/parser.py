@@ -1,10 +1,20 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+import os
+import re
+from collections import deque
+from collections.abc import Container, Iterable, Iterator
+from typing import TYPE_CHECKING
 
 from .models import Column, Drawable, Relation, Table
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
 TYPES: list[type[Drawable]] = [Table, Relation, Column]
+_TABLE_COLUMN_TYPES: list[type[Drawable]] = [Table, Column]
+_RELATION_COLUMN_TYPES: list[type[Drawable]] = [Relation, Column]
+_COLUMN_TYPES: list[type[Drawable]] = [Column]
 
 
 class ParsingException(Exception):
@@ -45,7 +55,7 @@ def remove_comments_from_line(line: str) -> str:
     return line[: line.index("#")].strip()
 
 
-def filter_lines_from_comments(lines: list[str]) -> Iterator[tuple[int, str, str]]:
+def filter_lines_from_comments(lines: Iterable[str]) -> Iterator[tuple[int, str, str]]:
     """Filter the lines from comments and non code lines."""
     for line_nb, raw_line in enumerate(lines):
         clean_line = remove_comments_from_line(raw_line)
@@ -54,15 +64,50 @@ def filter_lines_from_comments(lines: list[str]) -> Iterator[tuple[int, str, str
         yield line_nb, clean_line, raw_line
 
 
-def parse_line(line: str) -> Drawable:
-    for typ in TYPES:
+def _candidate_types(line: str) -> list[type[Drawable]]:
+    """Return the types whose regex can match the line, in the order of `TYPES`.
+
+    A table line starts with "[" and a relation line contains "--", so the column
+    lines, which are the most common ones, are only matched against `Column.RE`.
+    """
+    if line.startswith("["):
+        return TYPES if "--" in line else _TABLE_COLUMN_TYPES
+    return _RELATION_COLUMN_TYPES if "--" in line else _COLUMN_TYPES
+
+
+def _match_line(line: str) -> tuple[type[Drawable], re.Match]:
+    for typ in _candidate_types(line):
         match = typ.RE.match(line)
         if match:
-            return typ.make_from_match(match)
+            return typ, match
     msg = 'Line "{}" could not be parsed to an object.'
     raise ValueError(msg.format(line))
 
 
+def parse_line(line: str) -> Drawable:
+    typ, match = _match_line(line)
+    return typ.make_from_match(match)
+
+
+def _match_lines(lines: list[str]) -> list[tuple[int, dict[str, str | None]] | str]:
+    """Match a chunk of lines in a worker process.
+
+    For each line, returns the index of its type in `TYPES` with the groups of the match,
+    which are much cheaper to send back to the main process than the parsed objects.
+    The parsing stops on the first line which cannot be parsed, its error message is
+    returned instead.
+    """
+    rv: list[tuple[int, dict[str, str | None]] | str] = []
+    for line in lines:
+        try:
+            typ, match = _match_line(line)
+        except ValueError as e:
+            rv.append(str(e))
+            break
+        rv.append((TYPES.index(typ), match.groupdict()))
+    return rv
+
+
 def _check_no_current_table(new_obj: Drawable, current_table: Table | None) -> None:
     """Raises exception if we try to add a relation or a column with no current table."""
     if current_table is None:
@@ -85,7 +130,7 @@ def _update_check_inputs(
     assert current_table is None or current_table in tables
 
 
-def _check_colname_in_lst(column_name: str, columns_names: list[str]) -> None:
+def _check_colname_in_lst(column_name: str, columns_names: Container[str]) -> None:
     if column_name not in columns_names:
         msg = 'Cannot add a relation with column "{}" which is undefined'
         raise RelationNoColException(msg.format(column_name))
@@ -93,7 +138,7 @@ def _check_colname_in_lst(column_name: str, columns_names: list[str]) -> None:
 
 def _check_not_creating_duplicates(
     new_name: str,
-    names: list[str],
+    names: Container[str],
     type: str,
     exc: type[Exception],
 ) -> None:
@@ -102,82 +147,206 @@ def _check_not_creating_duplicates(
         raise exc(msg)
 
 
+class ParserState:
+    """State of the parsing, updated in place for each parsed object.
+
+    The tables and their columns are indexed by name so that the duplicate checks, the
+    lookups of the tables of a relation and the flagging of the foreign keys do not
+    depend on the size of the schema already parsed.
+    """
+
+    def __init__(self) -> None:
+        self.current_table: Table | None = None
+        self.tables: list[Table] = []
+        self.relations: list[Relation] = []
+        self._tables_by_name: dict[str, Table] = {}
+        self._columns_by_table: dict[str, dict[str, Column]] = {}
+
+    @classmethod
+    def from_models(
+        cls,
+        current_table: Table | None,
+        tables: list[Table],
+        relations: list[Relation],
+    ) -> ParserState:
+        """Build a state from already parsed tables and relations."""
+        state = cls()
+        for table in tables:
+            state._add_table(table)
+        state.relations.extend(relations)
+        state.current_table = current_table
+        return state
+
+    def _add_table(self, table: Table) -> None:
+        self.tables.append(table)
+        self._tables_by_name[table.name] = table
+        self._columns_by_table[table.name] = {c.name: c for c in table.columns}
+
+    def update(self, new_obj: Drawable) -> None:
+        """Update the state of the parsing with a newly parsed object."""
+        _check_no_current_table(new_obj, self.current_table)
+
+        if isinstance(new_obj, Table):
+            _check_not_creating_duplicates(
+                new_obj.name,
+                self._tables_by_name,
+                "table",
+                DuplicateTableException,
+            )
+            self._add_table(new_obj)
+            self.current_table = new_obj
+            return
+
+        if isinstance(new_obj, Relation):
+            _check_colname_in_lst(new_obj.right_table, self._tables_by_name)
+            _check_colname_in_lst(new_obj.left_table, self._tables_by_name)
+
+            # set foreign key flag if needed
+            if new_obj.left_column:
+                column = self._columns_by_table[new_obj.left_table].get(new_obj.left_column)
+                if column is not None:
+                    column.is_foreign_key = True
+                    self._tables_by_name[new_obj.left_table].reset_key()
+
+            self.relations.append(new_obj)
+            return
+
+        if isinstance(new_obj, Column):
+            assert self.current_table
+            columns = self._columns_by_table[self.current_table.name]
+            _check_not_creating_duplicates(
+                new_obj.name,
+                columns,
+                "column",
+                DuplicateColumnException,
+            )
+            self.current_table.columns.append(new_obj)
+            if self.current_table._key is not None:
+                self.current_table.reset_key()
+            columns[new_obj.name] = new_obj
+            return
+
+        msg = "new_obj cannot be of type {}"
+        raise ValueError(msg.format(new_obj.__class__.__name__))
+
+
 def update_models(
     new_obj,
     current_table: Table | None,
     tables: list[Table],
     relations: list[Relation],
 ) -> tuple[Table | None, list[Table], list[Relation]]:
-    """Update the state of the parsing."""
+    """Update the state of the parsing.
+
+    Builds a :class:`ParserState` from the given models on each call, prefer using
+    :meth:`ParserState.update` directly when parsing many objects.
+    """
     _update_check_inputs(current_table, tables, relations)
-    _check_no_current_table(new_obj, current_table)
-
-    if isinstance(new_obj, Table):
-        tables_names = [t.name for t in tables]
-        _check_not_creating_duplicates(
-            new_obj.name,
-            tables_names,
-            "table",
-            DuplicateTableException,
-        )
-        return new_obj, tables + [new_obj], relations
-
-    if isinstance(new_obj, Relation):
-        tables_by_name = {t.name: t for t in tables}
-        tables_names = list(tables_by_name)
-        _check_colname_in_lst(new_obj.right_table, tables_names)
-        _check_colname_in_lst(new_obj.left_table, tables_names)
-
-        # set foreign key flag if needed
-        left_table_obj = tables_by_name[new_obj.left_table]
-        if new_obj.left_column:
-            for column in left_table_obj.columns:
-                if column.name == new_obj.left_column:
-                    column.is_foreign_key = True
-                    break
-
-        return current_table, tables, relations + [new_obj]
-
-    if isinstance(new_obj, Column):
-        assert current_table
-        columns_names = [c.name for c in current_table.columns]
-        _check_not_creating_duplicates(
-            new_obj.name,
-            columns_names,
-            "column",
-            DuplicateColumnException,
-        )
-        current_table.columns.append(new_obj)
-        return current_table, tables, relations
+    state = ParserState.from_models(current_table, tables, relations)
+    state.update(new_obj)
+    return state.current_table, state.tables, state.relations
 
-    msg = "new_obj cannot be of type {}"
-    raise ValueError(msg.format(new_obj.__class__.__name__))
 
+def markdown_file_to_intermediary(
+    filename: str,
+    processes: int | None = 1,
+    chunk_size: int = 10_000,
+) -> tuple[list[Table], list[Relation]]:
+    """Parse a file and return to intermediary syntax.
 
-def markdown_file_to_intermediary(filename: str) -> tuple[list[Table], list[Relation]]:
-    """Parse a file and return to intermediary syntax."""
+    See `line_iterator_to_intermediary` for the parallel parsing options.
+    """
     with open(filename) as f:
-        lines = f.readlines()
-    return line_iterator_to_intermediary(lines)
+        return line_iterator_to_intermediary(f, processes=processes, chunk_size=chunk_size)
+
+
+def _split_table_blocks(
+    lines: Iterable[tuple[int, str, str]],
+    chunk_size: int,
+) -> Iterator[list[tuple[int, str, str]]]:
+    """Split the filtered lines in chunks of at least chunk_size lines starting on a table."""
+    chunk: list[tuple[int, str, str]] = []
+    for item in lines:
+        if len(chunk) >= chunk_size and item[1].startswith("["):
+            yield chunk
+            chunk = []
+        chunk.append(item)
+    if chunk:
+        yield chunk
+
+
+def _parse_lines(line_iterator: Iterable[str]) -> Iterator[tuple[int, str, Drawable]]:
+    for line_nb, line, raw_line in filter_lines_from_comments(line_iterator):
+        yield line_nb, raw_line, parse_line(line)
+
+
+def _parse_lines_parallel(
+    line_iterator: Iterable[str],
+    processes: int | None,
+    chunk_size: int,
+) -> Iterator[tuple[int, str, Drawable]]:
+    from concurrent.futures import ProcessPoolExecutor
+
+    processes = processes or os.cpu_count() or 1
+    chunks = _split_table_blocks(filter_lines_from_comments(line_iterator), chunk_size)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # a few chunks in flight per process, the lines are read as the chunks are matched
+        pending: deque[tuple[list[tuple[int, str, str]], Future]] = deque()
+        for chunk in chunks:
+            lines = [line for _, line, _ in chunk]
+            pending.append((chunk, executor.submit(_match_lines, lines)))
+            if len(pending) >= 2 * processes:
+                yield from _matched_objects(*pending.popleft())
+        while pending:
+            yield from _matched_objects(*pending.popleft())
+
+
+def _matched_objects(
+    chunk: list[tuple[int, str, str]], matches: Future
+) -> Iterator[tuple[int, str, Drawable]]:
+    """Yields the objects of the lines of the chunk matched by a worker process."""
+    for (line_nb, _, raw_line), matched in zip(chunk, matches.result()):
+        if isinstance(matched, str):
+            raise ValueError(matched)
+        type_index, groups = matched
+        yield line_nb, raw_line, TYPES[type_index].make_from_groups(groups)
 
 
 def line_iterator_to_intermediary(
-    line_iterator: list[str],
+    line_iterator: Iterable[str],
+    processes: int | None = 1,
+    chunk_size: int = 10_000,
 ) -> tuple[list[Table], list[Relation]]:
-    """Parse an iterator of str (one string per line) to the intermediary syntax."""
-    current_table = None
-    tables: list[Table] = []
-    relations: list[Relation] = []
+    """Parse an iterator of str (one string per line) to the intermediary syntax.
+
+    The lines are consumed lazily, so an open file or a generator can be given directly.
+
+    :param processes: number of worker processes used to match the lines, None uses all
+        the cores. With the default 1, everything is parsed in the current process.
+    :param chunk_size: minimal number of lines sent to a worker process at once. The
+        chunks are split on the table declarations.
+    """
+    if processes == 1:
+        parsed_lines = _parse_lines(line_iterator)
+    else:
+        # the lines are matched in parallel, the models are still updated in order so
+        # that the relations are validated and the errors reported as when parsing serially
+        parsed_lines = _parse_lines_parallel(line_iterator, processes, chunk_size)
+    return parsed_lines_to_intermediary(parsed_lines)
+
+
+def parsed_lines_to_intermediary(
+    parsed_lines: Iterable[tuple[int, str, Drawable]],
+) -> tuple[list[Table], list[Relation]]:
+    """Build the intermediary syntax from the objects parsed on each line, in order.
+
+    :param parsed_lines: tuples of the line number, the raw line and the object parsed from it.
+    """
+    state = ParserState()
     errors: list[ParsingException] = []
-    for line_nb, line, raw_line in filter_lines_from_comments(line_iterator):
+    for line_nb, raw_line, new_obj in parsed_lines:
         try:
-            new_obj = parse_line(line)
-            current_table, tables, relations = update_models(
-                new_obj,
-                current_table,
-                tables,
-                relations,
-            )
+            state.update(new_obj)
         except ParsingException as e:
             e.line_nb = line_nb  # type:ignore
             e.line = raw_line  # type:ignore
@@ -185,4 +354,4 @@ def line_iterator_to_intermediary(
     if len(errors) != 0:
         msg = f"eralchemy couldn't complete the generation due the {len(errors)} following errors"
         raise ParsingException(msg + "\n\n".join(e.traceback for e in errors))
-    return tables, relations
+    return state.tables, state.relations
@@ -0,0 +1,162 @@
+"""Pool of long lived processes rendering the dot sources with graphviz.
+
+Loading graphviz and its plugins costs more than rendering a small diagram, so the workers load
+them once and render the successive diagrams: in-process with libgvc when pygraphviz is installed,
+else with a dot process kept open per engine and format (see `DotProcess`).
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from types import TracebackType
+
+# formats whose images are written one after the other by dot when it renders several graphs,
+# and are the same for the same graph
+STREAMED_FORMATS = ("svg", "png", "gif", "jpg", "jpeg", "dot")
+# graph rendered after each diagram, its image marks the end of the image of the diagram
+SEPARATOR = "graph eralchemy_separator {}\n"
+
+# dot processes of the worker, by engine and format
+_dot_processes: dict[tuple[str, str], DotProcess] = {}
+
+
+class RenderPool:
+    """Renders the dot sources in a pool of worker processes reused across the renders.
+
+    At most max_pending renders are queued or running, `submit` blocks until one of them is done,
+    so that a producer faster than graphviz does not queue all its diagrams in memory.
+    The pool is given to `render_er` or `intermediary_to_schema` and closed by the caller::
+
+        with RenderPool() as pool:
+            for module in modules:
+                render_er(module.metadata, f"{module.name}.svg", render_pool=pool)
+
+    :param processes: int, number of worker processes, all the cores if None.
+    :param max_pending: int, maximal number of renders queued or running,
+        defaults to twice the number of processes.
+    """
+
+    def __init__(self, processes: int | None = None, max_pending: int | None = None) -> None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        processes = processes or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=processes, initializer=_load_graphviz)
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * processes)
+
+    def submit(self, dot_file: str, engine: str, extension: str) -> Future[bytes]:
+        """Queues the render of the dot source, returns the future of the image."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(_render, dot_file, engine, extension)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def render(self, dot_file: str, engine: str, extension: str) -> bytes:
+        """Returns the image of the dot source laid out by the graphviz engine."""
+        return self.submit(dot_file, engine, extension).result()
+
+    def close(self) -> None:
+        """Waits for the queued renders and stops the workers."""
+        self._executor.shutdown()
+
+    def __enter__(self) -> RenderPool:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class DotProcess:
+    """dot process rendering the successive graphs written to its input.
+
+    The graphviz package starts dot for each image, this process is started once. Each graph is
+    followed by the `SEPARATOR` graph, whose image rendered beforehand marks the end of the image
+    of the graph in the output. The errors are raised like the ones of the graphviz package.
+    """
+
+    def __init__(self, engine: str, extension: str) -> None:
+        # nop2 is neato -n2, as with the graphviz package
+        layout = ["-Kneato", "-n2"] if engine == "nop2" else [f"-K{engine}"]
+        self.args = ["dot", *layout, f"-T{extension}"]
+        self._separator = subprocess.run(
+            self.args, input=SEPARATOR.encode(), capture_output=True, check=True
+        ).stdout
+        # dot shares the offset of the file, rewound with it before each render
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            self.args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._stderr
+        )
+
+    def render(self, dot_file: str) -> bytes:
+        """Returns the image of the dot source."""
+        assert self._process.stdin is not None and self._process.stdout is not None
+        self._stderr.seek(0)
+        self._stderr.truncate()
+        output = bytearray()
+        try:
+            # the line directive numbers the lines of the errors from the start of the graph
+            self._process.stdin.write(f"# 1\n{dot_file}\n{SEPARATOR}".encode())
+            self._process.stdin.flush()
+            while not output.endswith(self._separator):
+                chunk = os.read(self._process.stdout.fileno(), 65536)
+                if not chunk:
+                    break
+                output += chunk
+        except BrokenPipeError:
+            pass
+        self._stderr.seek(0)
+        stderr = self._stderr.read()
+        if not output.endswith(self._separator) or b"Error" in stderr:
+            # dot stops on the syntax errors, the process is started again for the next render
+            returncode = self._process.poll() or 1
+            self.close()
+            raise subprocess.CalledProcessError(returncode, self.args, bytes(output), stderr)
+        return bytes(output[: -len(self._separator)])
+
+    def close(self) -> None:
+        """Stops dot."""
+        self._process.kill()
+        self._process.wait()
+        for stream in (self._process.stdin, self._process.stdout, self._stderr):
+            if stream is not None:
+                stream.close()
+
+
+def _load_graphviz() -> None:
+    """Renders an empty graph so the worker loads graphviz and its plugins before the first job."""
+    try:
+        _render("graph {}", "dot", "svg")
+    except Exception:
+        # the error is raised again by the renders
+        pass
+
+
+def _render(dot_file: str, engine: str, extension: str) -> bytes:
+    from .main import _graphviz, _render_dot
+
+    binding = _graphviz()
+    if binding is None or binding.__name__ != "graphviz" or extension not in STREAMED_FORMATS:
+        return _render_dot(dot_file, engine, extension)
+    process = _dot_processes.get((engine, extension))
+    if process is None:
+        process = _dot_processes[engine, extension] = DotProcess(engine, extension)
+    try:
+        return process.render(dot_file)
+    except subprocess.CalledProcessError:
+        del _dot_processes[engine, extension]
+        raise
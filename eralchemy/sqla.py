@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 
@@ -127,8 +128,18 @@ def database_to_intermediary(
     schema: str | None = None,
 ) -> tuple[list[Table], list[Relation]]:
     """Introspect from the database (given the database_uri) to create the intermediary representation."""
+    return engine_to_intermediary(create_engine(database_uri), schema)
+
+
+def engine_to_intermediary(
+    engine: sa.Engine,
+    schema: str | None = None,
+) -> tuple[list[Table], list[Relation]]:
+    """Introspect the database of the engine to create the intermediary representation.
+
+    :param schema: name of the schema, or names of several schemas separated by commas.
+    """
     Base = automap_base()
-    engine = create_engine(database_uri)
     if schema is not None:
         schemas = schema.split(",")
         for schema in schemas:
@@ -147,3 +158,53 @@ def database_to_intermediary(
         )
 
     return declarative_to_intermediary(Base)
+
+
+def database_fingerprint(engine: sa.Engine, schema: str | None = None) -> str:
+    """Returns a digest of the tables, columns and foreign keys of the database of the engine.
+
+    It changes when the schema of the database changes, and is much cheaper to compute than
+    the intermediary: sqlite counts the schema changes, the other databases are inspected
+    without building the models.
+    """
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            return str(connection.exec_driver_sql("PRAGMA schema_version").scalar())
+        return _inspected_fingerprint(sa.inspect(connection), schema)
+
+
+def _inspected_fingerprint(inspector: sa.Inspector, schema: str | None = None) -> str:
+    """Returns a digest of the columns, primary keys and foreign keys of the tables."""
+    digest = hashlib.sha256()
+    schemas = [None] if schema is None else [name.strip() for name in schema.split(",")]
+    for name in schemas:
+        if hasattr(inspector, "get_multi_columns"):
+            # a query per kind of objects instead of one per table, since SQLAlchemy 2.0
+            columns = inspector.get_multi_columns(schema=name)
+            primary_keys = inspector.get_multi_pk_constraint(schema=name)
+            foreign_keys = inspector.get_multi_foreign_keys(schema=name)
+        else:
+            tables = inspector.get_table_names(schema=name)
+            columns = {(name, t): inspector.get_columns(t, schema=name) for t in tables}
+            primary_keys = {(name, t): inspector.get_pk_constraint(t, schema=name) for t in tables}
+            foreign_keys = {(name, t): inspector.get_foreign_keys(t, schema=name) for t in tables}
+        for key in sorted(columns, key=str):
+            digest.update(repr(key).encode())
+            for column in columns[key]:
+                digest.update(
+                    repr((column["name"], format_type(column["type"]), column["nullable"])).encode()
+                )
+            primary_key = primary_keys.get(key)
+            digest.update(repr(primary_key and primary_key["constrained_columns"]).encode())
+            for fk in foreign_keys.get(key, []):
+                digest.update(
+                    repr(
+                        (
+                            fk["constrained_columns"],
+                            fk["referred_schema"],
+                            fk["referred_table"],
+                            fk["referred_columns"],
+                        )
+                    ).encode()
+                )
+    return digest.hexdigest()
@@ -0,0 +1,126 @@
+"""Watch a markdown file and render it again on each change.
+
+The parsed objects are kept in memory per table block, a block being a table declaration with
+the lines following it, so only the blocks which changed are parsed again.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from .models import Column, Drawable, Relation, Table
+from .parser import (
+    filter_lines_from_comments,
+    parse_line,
+    parsed_lines_to_intermediary,
+)
+
+Block = list[tuple[int, str, Drawable]]
+
+
+def split_blocks(lines: Iterable[str]) -> Iterator[tuple[int, tuple[str, ...]]]:
+    """Split the lines in table blocks, yields the number of the first line and the lines."""
+    start = 0
+    block: list[str] = []
+    for line_nb, line in enumerate(lines):
+        # comments start with "#" so only the table declarations start with "["
+        if line.lstrip().startswith("[") and block:
+            yield start, tuple(block)
+            start, block = line_nb, []
+        block.append(line)
+    if block:
+        yield start, tuple(block)
+
+
+def _parse_block(lines: tuple[str, ...]) -> Block:
+    """Returns the objects parsed from the block with the line numbers relative to the block."""
+    return [
+        (line_nb, raw_line, parse_line(line))
+        for line_nb, line, raw_line in filter_lines_from_comments(lines)
+    ]
+
+
+def _replay(blocks: list[tuple[int, Block]]) -> Iterator[tuple[int, str, Drawable]]:
+    """Yields the objects of the blocks in order, reset to their state right after parsing."""
+    for start, block in blocks:
+        for line_nb, raw_line, new_obj in block:
+            if isinstance(new_obj, Table):
+                new_obj.columns.clear()
+                new_obj.reset_key()
+            elif isinstance(new_obj, Column):
+                new_obj.is_foreign_key = False
+            yield start + line_nb, raw_line, new_obj
+
+
+class IncrementalParser:
+    """Parse the successive versions of a markdown file, reusing the unchanged table blocks.
+
+    The models are still updated in order on each parse, so the relations are validated and
+    the errors reported exactly as with `line_iterator_to_intermediary`.
+    """
+
+    def __init__(self) -> None:
+        self._blocks: dict[tuple[str, ...], Block] = {}
+        self.parsed_blocks = 0
+
+    def parse(self, lines: Iterable[str]) -> tuple[list[Table], list[Relation]]:
+        blocks: dict[tuple[str, ...], Block] = {}
+        ordered_blocks = []
+        for start, block_lines in split_blocks(lines):
+            block = self._blocks.get(block_lines)
+            # the objects of a block repeated in the file must not be shared
+            if block is None or block_lines in blocks:
+                block = _parse_block(block_lines)
+                self.parsed_blocks += 1
+            blocks.setdefault(block_lines, block)
+            ordered_blocks.append((start, block))
+        self._blocks = blocks
+        return parsed_lines_to_intermediary(_replay(ordered_blocks))
+
+
+def watch(
+    input: str,
+    output: str,
+    mode: str = "auto",
+    interval: float = 0.5,
+    **kwargs: Any,
+) -> None:
+    """Render the markdown file input to output each time it is modified, until interrupted.
+
+    The keyword arguments are passed to `render_intermediary`.
+    """
+    from .main import _print_render_errors, render_intermediary
+
+    parser = IncrementalParser()
+    last_stat = None
+    try:
+        while True:
+            try:
+                stat = os.stat(input)
+            except OSError:
+                # the editors saving by deleting and writing the file again
+                time.sleep(interval)
+                continue
+            if (stat.st_mtime_ns, stat.st_size) != last_stat:
+                last_stat = (stat.st_mtime_ns, stat.st_size)
+                start = time.perf_counter()
+                parsed_blocks = parser.parsed_blocks
+                rendered = False
+                with _print_render_errors():
+                    with open(input) as f:
+                        tables, relationships = parser.parse(f.readlines())
+                    render_intermediary(tables, relationships, output, mode, **kwargs)
+                    rendered = True
+                if rendered:
+                    print(
+                        f"rendered {output} in {time.perf_counter() - start:.2f}s"
+                        f" ({parser.parsed_blocks - parsed_blocks} table blocks parsed)",
+                        file=sys.stderr,
+                    )
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
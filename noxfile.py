@@ -47,3 +47,20 @@ def mypy(session):
     session.install("mypy")
     test_files = session.posargs or ["eralchemy"]
     session.run("mypy", *test_files)
+
+
+@nox.session(reuse_venv=True)
+def bench(session):
+    """Run the benchmarks, a single benchmark can be selected with the posargs."""
+    session.install(".")
+    benchmarks = session.posargs or [
+        "parser",
+        "memory",
+        "dot",
+        "output",
+        "layout",
+        "engine",
+        "pool",
+    ]
+    for benchmark in benchmarks:
+        session.run("python", f"benchmarks/bench_{benchmark}.py")
@@ -185,7 +185,8 @@ def check_filter(actual_tables, actual_relationships):
 
 
 @pytest.fixture
-def sqlite_db_uri(db_uri="sqlite:///test.db"):
+def sqlite_db_uri(tmp_path):
+    db_uri = f"sqlite:///{tmp_path / 'test.db'}"
     engine = create_engine(db_uri)
     tables = [m.__table__ for m in (Parent, Child, Exclude)]
     Base.metadata.create_all(engine, tables=tables)
@@ -1,3 +1,5 @@
+import pytest
+
 from eralchemy.helpers import check_args
 from eralchemy.main import get_argparser
 
@@ -14,3 +16,40 @@ def test_version():
 
 def test_normal():
     parse_test("-i sqlite:///relative/path/to/db.db -o erd_from_sqlite.pdf".split(" "))
+
+
+def test_multiple_outputs():
+    parse_test("-i sqlite:///db.db -o erd.pdf -o erd.md -o erd.puml".split(" "))
+
+
+def test_multiple_outputs_with_mode():
+    with pytest.raises(SystemExit):
+        parse_test("-i sqlite:///db.db -o erd.pdf -o erd.md -m er".split(" "))
+
+
+def test_batch():
+    parse_test(["--batch", "jobs.toml", "--batch-processes", "4"])
+
+
+def test_batch_with_input():
+    with pytest.raises(SystemExit):
+        parse_test(["--batch", "jobs.toml", "-i", "schema.er"])
+
+
+def test_serve():
+    parse_test(["--serve", "127.0.0.1:8000", "-i", "inputs.toml"])
+
+
+def test_serve_with_output():
+    with pytest.raises(SystemExit):
+        parse_test(["--serve", "8000", "-i", "inputs.toml", "-o", "erd.svg"])
+
+
+def test_negative_depth():
+    with pytest.raises(SystemExit):
+        parse_test(["-i", "schema.er", "-o", "erd.svg", "--focus", "orders", "--depth", "-1"])
+
+
+def test_depth_without_focus():
+    with pytest.raises(SystemExit):
+        parse_test(["-i", "schema.er", "-o", "erd.svg", "--depth", "2"])
@@ -0,0 +1,133 @@
+import sys
+
+import pytest
+
+from eralchemy import main
+from eralchemy.batch import load_jobs, print_summary, run_batch
+from eralchemy.main import cli, render_er
+from tests.common import markdown
+
+
+@pytest.fixture
+def schema(tmp_path):
+    filename = tmp_path / "schema.er"
+    filename.write_text(markdown)
+    return filename
+
+
+def write_manifest(tmp_path, content):
+    manifest = tmp_path / "jobs.toml"
+    manifest.write_text(content)
+    return manifest
+
+
+def test_load_jobs(tmp_path):
+    manifest = write_manifest(
+        tmp_path,
+        """
+[defaults]
+input = "schema.er"
+exclude_columns = ["name"]
+
+[[jobs]]
+output = "schema.md"
+
+[[jobs]]
+input = "other.er"
+output = "other.dot"
+title = "Other"
+""",
+    )
+    assert load_jobs(manifest) == [
+        {"input": "schema.er", "exclude_columns": ["name"], "output": "schema.md"},
+        {"input": "other.er", "exclude_columns": ["name"], "output": "other.dot", "title": "Other"},
+    ]
+
+
+@pytest.mark.parametrize(
+    ("content", "message"),
+    [
+        ("", "no \\[\\[jobs\\]\\]"),
+        ('[[jobs]]\ninput = "schema.er"\noutput = "a.md"\ncolor = "red"', "unknown options: color"),
+        ('[[jobs]]\noutput = "a.md"', "job 1 has no input"),
+    ],
+)
+def test_load_jobs_errors(tmp_path, content, message):
+    with pytest.raises(ValueError, match=message):
+        load_jobs(write_manifest(tmp_path, content))
+
+
+def test_run_batch(tmp_path, schema, monkeypatch):
+    calls = []
+    all_to_intermediary = main.all_to_intermediary
+
+    def counting_all_to_intermediary(*args, **kwargs):
+        calls.append(args)
+        return all_to_intermediary(*args, **kwargs)
+
+    monkeypatch.setattr(main, "all_to_intermediary", counting_all_to_intermediary)
+    jobs = [
+        {"input": str(schema), "output": str(tmp_path / "schema.md")},
+        {"input": str(schema), "output": str(tmp_path / "parent.er"), "focus": ["parent"]},
+        {"input": str(schema), "output": str(tmp_path / "schema.txt"), "mode": "er"},
+        {"input": str(schema), "output": str(tmp_path / "schema.unknown")},
+        {"input": str(tmp_path / "missing.er"), "output": str(tmp_path / "missing.md")},
+    ]
+    results = run_batch(jobs, processes=2)
+    assert [result.output for result in results] == [job["output"] for job in jobs]
+    assert [result.error is None for result in results] == [True, True, True, False, False]
+    assert "missing.er" in results[4].error
+    # the missing input is tried once, the schema introspected once
+    assert len(calls) == 2
+
+    render_er(str(schema), str(tmp_path / "expected.md"))
+    assert (tmp_path / "schema.md").read_text() == (tmp_path / "expected.md").read_text()
+    render_er(str(schema), str(tmp_path / "expected.er"), focus=["parent"])
+    assert (tmp_path / "parent.er").read_text() == (tmp_path / "expected.er").read_text()
+
+
+def test_print_summary(tmp_path, schema, capsys):
+    results = run_batch(
+        [
+            {"input": str(schema), "output": str(tmp_path / "schema.md")},
+            {"input": str(schema), "output": str(tmp_path / "schema.unknown")},
+        ],
+        processes=1,
+    )
+    print_summary(results, 1.5, sys.stdout)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("ok ") and lines[0].endswith("schema.md")
+    assert lines[1].startswith("failed ") and "schema.unknown" in lines[1]
+    assert lines[2] == "1 jobs rendered, 1 failed in 1.50s"
+
+
+def test_cli_batch(tmp_path, schema, capsys):
+    manifest = write_manifest(
+        tmp_path,
+        f"""
+[defaults]
+input = "{schema}"
+
+[[jobs]]
+output = "{tmp_path / "schema.md"}"
+
+[[jobs]]
+output = "{tmp_path / "schema.dot"}"
+title = "Schema"
+""",
+    )
+    cli(["--batch", str(manifest), "--batch-processes", "1"])
+    assert (tmp_path / "schema.md").exists()
+    assert 'label="Schema"' in (tmp_path / "schema.dot").read_text()
+    assert "2 jobs rendered, 0 failed" in capsys.readouterr().err
+
+
+def test_cli_batch_failed(tmp_path, capsys):
+    manifest = write_manifest(
+        tmp_path,
+        f'[[jobs]]\ninput = "{tmp_path / "missing.er"}"\noutput = "{tmp_path / "a.md"}"',
+    )
+    with pytest.raises(SystemExit) as exit_info:
+        cli(["--batch", str(manifest)])
+    assert exit_info.value.code == 1
+    assert "0 jobs rendered, 1 failed" in capsys.readouterr().err
@@ -0,0 +1,129 @@
+import os
+
+from eralchemy import cache as cache_module
+from eralchemy import main
+from eralchemy.cache import (
+    FileCache,
+    cached_markdown_file_to_intermediary,
+    cached_render,
+    dump_intermediary,
+    file_digest,
+    get_cache,
+    load_intermediary,
+)
+from eralchemy.main import all_to_intermediary, intermediary_to_schema
+from tests.common import markdown, relationships, tables
+
+
+def test_dump_load_intermediary():
+    actual_tables, actual_relationships = load_intermediary(
+        dump_intermediary(tables, relationships)
+    )
+    assert actual_tables == tables
+    assert actual_relationships == relationships
+    assert [c.is_foreign_key for c in actual_tables[1].columns] == [False, True]
+
+
+def test_cached_markdown_file_to_intermediary(tmp_path, monkeypatch):
+    filename = tmp_path / "schema.er"
+    filename.write_text(markdown)
+    cache = FileCache(tmp_path / "cache")
+    expected = cached_markdown_file_to_intermediary(str(filename), cache, "1.0")
+    assert len(os.listdir(cache.directory)) == 1
+
+    def fail(filename):
+        raise AssertionError("the file should not be parsed again")
+
+    monkeypatch.setattr(cache_module, "line_iterator_to_intermediary", fail)
+    assert cached_markdown_file_to_intermediary(str(filename), cache, "1.0") == expected
+
+
+def test_cached_markdown_file_modified_while_parsed(tmp_path, monkeypatch):
+    filename = tmp_path / "schema.er"
+    filename.write_text(markdown)
+    modified = markdown.replace("name {", "title {")
+
+    def digest_then_modify(filename):
+        digest = file_digest(filename)
+        filename.write_text(modified)
+        return digest
+
+    cache = FileCache(tmp_path / "cache")
+    monkeypatch.setattr(cache_module, "file_digest", digest_then_modify)
+    actual_tables, _ = cached_markdown_file_to_intermediary(filename, cache, "1.0")
+    assert "title" in [c.name for t in actual_tables for c in t.columns]
+    # the entry is the one of the modified content
+    (entry,) = os.listdir(cache.directory)
+    assert file_digest(filename) in entry
+
+
+def test_file_cache_read_only(tmp_path, monkeypatch):
+    cache = FileCache(tmp_path)
+    cache.set("key", b"value")
+
+    def read_only(path):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(os, "utime", read_only)
+    assert cache.get("key") == b"value"
+
+
+def test_file_cache_evicts_least_recently_used(tmp_path):
+    cache = FileCache(tmp_path, max_size=10)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    os.utime(tmp_path / "a", (0, 0))
+    os.utime(tmp_path / "b", (1, 1))
+    assert cache.get("a") == b"aaaa"
+    cache.set("c", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+
+
+def test_get_cache_from_env(tmp_path, monkeypatch):
+    monkeypatch.delenv("ERALCHEMY_CACHE_DIR", raising=False)
+    assert get_cache() is None
+    monkeypatch.setenv("ERALCHEMY_CACHE_DIR", str(tmp_path))
+    assert get_cache().directory == tmp_path
+
+
+def test_all_to_intermediary_markdown_file_cached(tmp_path):
+    filename = tmp_path / "schema.er"
+    filename.write_text(markdown)
+    for _ in range(2):
+        actual_tables, actual_relationships = all_to_intermediary(
+            str(filename), cache_dir=tmp_path / "cache"
+        )
+        assert actual_tables == tables
+        assert actual_relationships == relationships
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+
+def test_cached_render(tmp_path):
+    cache = FileCache(tmp_path)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return b"image"
+
+    assert cached_render(cache, "graph {}", "dot", "png", "2.42", render) == b"image"
+    assert cached_render(cache, "graph {}", "dot", "png", "2.42", render) == b"image"
+    assert len(renders) == 1
+    cached_render(cache, "graph {}", "dot", "svg", "2.42", render)
+    cached_render(cache, "graph {}", "neato", "png", "2.42", render)
+    cached_render(cache, "graph {}", "dot", "png", "2.43", render)
+    cached_render(cache, "graph { a }", "dot", "png", "2.42", render)
+    assert len(renders) == 5
+
+
+def test_intermediary_to_schema_cache(tmp_path, monkeypatch):
+    expected = intermediary_to_schema(tables, relationships, cache_dir=tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+
+    def fail(dot_file, engine, extension):
+        raise AssertionError("the image should not be rendered again")
+
+    monkeypatch.setattr(main, "_render_dot", fail)
+    assert intermediary_to_schema(tables, relationships, cache_dir=tmp_path) == expected
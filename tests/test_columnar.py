@@ -0,0 +1,47 @@
+import pytest
+
+from eralchemy.columnar import ColumnarTables
+from eralchemy.main import _intermediary_to_dot, _intermediary_to_mermaid, filter_resources
+from tests.common import relationships, tables
+
+
+def test_columnar_tables_round_trip():
+    columnar = ColumnarTables.from_tables(tables)
+    assert len(columnar) == 3
+    assert list(columnar.table_offsets) == [0, 2, 4, 6]
+    assert list(columnar.is_foreign_key) == [0, 0, 0, 1, 0, 1]
+    assert columnar.to_tables() == tables
+    assert [c.is_foreign_key for c in columnar.to_tables()[1].columns] == [False, True]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    (
+        {},
+        {"include_tables": ["parent", "^ch.*"]},
+        {"exclude_tables": ["exclude"]},
+        {"include_columns": ["id.*", "not_match"]},
+        {"exclude_columns": ["i."]},
+        {"sort_mode": "original"},
+    ),
+)
+def test_filter_columnar_tables(kwargs):
+    expected_tables, expected_relationships = filter_resources(tables, relationships, **kwargs)
+    actual_tables, actual_relationships = filter_resources(
+        ColumnarTables.from_tables(tables), relationships, **kwargs
+    )
+    assert isinstance(actual_tables, ColumnarTables)
+    assert actual_relationships == expected_relationships
+    assert [[c.name for c in t.columns] for t in actual_tables] == [
+        [c.name for c in t.columns] for t in expected_tables
+    ]
+
+
+def test_columnar_tables_to_dot_and_mermaid():
+    columnar = ColumnarTables.from_tables(tables)
+    assert _intermediary_to_dot(columnar, relationships) == _intermediary_to_dot(
+        tables, relationships
+    )
+    assert _intermediary_to_mermaid(columnar, relationships) == _intermediary_to_mermaid(
+        tables, relationships
+    )
@@ -1,5 +1,19 @@
-from eralchemy import render_er
-from eralchemy.cst import config, dot_star_primary, dot_top_down, reset_config
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from eralchemy import RenderConfig, render_er
+from eralchemy.cst import (
+    DEFAULT_CONFIG,
+    config,
+    dot_crowfoot,
+    dot_digraph,
+    dot_star_primary,
+    dot_top_down,
+    reset_config,
+)
+from eralchemy.main import intermediary_to_dot, intermediary_to_markdown
+from tests.common import markdown, relationships, tables
 
 
 def render_dot():
@@ -34,3 +48,67 @@ def reder_dot_top_down():
     assert "rankdir=TB" in config["DOT_GRAPH_BEGINNING"]
     output = render_er("../example/forum.er", output=None, mode="dot").decode("utf-8")
     assert "rankdir=TB" in output
+
+
+def test_render_config_adjustments():
+    assert RenderConfig() == DEFAULT_CONFIG
+    render_config = RenderConfig().star_primary().top_down()
+    assert render_config["DOT_KEY_OPENING"] == "*"
+    assert "rankdir=TB" in render_config["DOT_GRAPH_BEGINNING"]
+    assert render_config.left_right().star_underline() == RenderConfig()
+    assert hash(render_config) == hash(RenderConfig(dict(render_config)))
+    with pytest.raises(AttributeError):
+        render_config._values = {}
+    with pytest.raises(ValueError, match="Unknown config keys: COLOR"):
+        RenderConfig(COLOR="red")
+
+
+def test_global_config_adjustments():
+    try:
+        dot_digraph()
+        dot_crowfoot()
+        assert RenderConfig.current() == RenderConfig().digraph().crowfoot()
+    finally:
+        reset_config()
+
+
+def test_render_config_outputs():
+    render_config = RenderConfig().star_primary().digraph()
+    output = intermediary_to_dot(tables, relationships, render_config=render_config).decode()
+    assert output.startswith("digraph {")
+    assert "*<FONT>id</FONT>" in output
+    assert " -> " in output
+    # the global config is not changed
+    assert config == DEFAULT_CONFIG
+    assert intermediary_to_dot(tables, relationships).decode().startswith("graph {")
+
+    render_config = RenderConfig(MARKDOWN_TITLE="# {}")
+    output = intermediary_to_markdown(tables, relationships, "Title", render_config).decode()
+    assert output.startswith("# Title\n")
+
+
+def test_render_er_render_config(tmp_path):
+    filename = tmp_path / "schema.er"
+    filename.write_text(markdown)
+    render_config = RenderConfig().crowfoot()
+    output = render_er(str(filename), None, mode="dot", render_config=render_config).decode()
+    assert 'arrowhead="crowodot"' in output
+    render_er(str(filename), str(tmp_path / "schema.dot"), render_config=render_config)
+    assert (tmp_path / "schema.dot").read_text() == output
+
+
+def test_render_configs_in_threads():
+    render_configs = [
+        RenderConfig(),
+        RenderConfig().star_primary(),
+        RenderConfig().top_down().crowfoot(),
+        RenderConfig().digraph(),
+    ] * 8
+
+    def render(render_config):
+        return intermediary_to_dot(tables, relationships, render_config=render_config)
+
+    expected = [render(render_config) for render_config in render_configs]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(render, render_configs)) == expected
+    assert len(set(expected)) == 4
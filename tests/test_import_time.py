@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+import pytest
+
+from tests.common import markdown
+
+# modules only needed by the database inputs, the graph outputs or the parallel jobs
+HEAVY_MODULES = ("sqlalchemy", "pygraphviz", "graphviz", "multiprocessing", "concurrent")
+# about 25ms on a laptop, the heavy modules alone take 200ms
+MAX_IMPORT_TIME_US = 150_000
+
+
+def import_times(code):
+    """Returns the cumulative import time in microseconds of each module imported by code."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["-v"],
+        ["-i", "{input}", "-o", "{output}.md"],
+        ["-i", "{input}", "-o", "{output}.er"],
+        ["-i", "{input}", "-o", "{output}.dot"],
+        ["-i", "{input}", "-o", "{output}.puml"],
+    ],
+)
+def test_text_paths_import_time(tmp_path, args):
+    filename = tmp_path / "schema.er"
+    filename.write_text(markdown)
+    args = [arg.format(input=filename, output=tmp_path / "schema") for arg in args]
+    code = f"from eralchemy.main import cli\ntry:\n    cli({args!r})\nexcept SystemExit:\n    pass"
+    times = import_times(code)
+    heavy = sorted(name for name in times if name.split(".")[0] in HEAVY_MODULES)
+    assert heavy == []
+    assert times["eralchemy"] < MAX_IMPORT_TIME_US
@@ -5,7 +5,9 @@ from multiprocessing import Process
 import pytest
 from pygraphviz import AGraph
 
+from eralchemy.cst import dot_star_primary, reset_config
 from eralchemy.main import _intermediary_to_dot
+from eralchemy.models import Column, dot_templates
 from tests.common import (
     child,
     child_id,
@@ -31,7 +33,7 @@ def _run_graph(dot):
     graph = AGraph()
     graph = graph.from_string(dot)
     extension = "png"
-    graph.draw(path="output.png", prog="dot", format=extension)
+    graph.draw(prog="dot", format=extension)
     sys.exit(0)
 
 
@@ -113,3 +115,14 @@ def assert_table_well_rendered_to_dot(table):
 def test_table():
     assert_table_well_rendered_to_dot(child)
     assert_table_well_rendered_to_dot(parent)
+
+
+def test_dot_templates_follow_config():
+    try:
+        dot_star_primary()
+        assert parent_id.to_dot().startswith('<TR><TD ALIGN="LEFT" PORT="id">*<FONT>id</FONT>')
+        assert parent_id.to_dot(dot_templates()) == parent_id.to_dot()
+    finally:
+        reset_config()
+    assert parent_id.to_dot().startswith('<TR><TD ALIGN="LEFT" PORT="id"><u><FONT>id</FONT></u>')
+    assert Column(name="", type=None).to_dot() == '<TR><TD ALIGN="LEFT" ><FONT></FONT> </TD></TR>'
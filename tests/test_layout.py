@@ -0,0 +1,222 @@
+import subprocess
+import sys
+import time
+from functools import partial
+
+import pytest
+
+from eralchemy import main
+from eralchemy.layout import (
+    LayoutTimeoutError,
+    choose_engine,
+    connected_components,
+    degraded_layouts,
+    layout_components,
+    pack_layouts,
+    run_with_timeout,
+    translate_layout,
+    unflatten,
+)
+from eralchemy.main import _intermediary_to_dot, _layout_dot, intermediary_to_schema
+from eralchemy.models import Column, Relation, Table
+from tests.common import relationships, tables
+
+alone = Table(name="alone", columns=[Column(name="id", type="INTEGER", is_key=True)])
+
+laid_out = """graph {
+	graph [bb="0,0,100,50"];
+	a	[label=<<TABLE><TR><TD PORT="pos">pos="1,2"</TD></TR></TABLE>>,
+		pos="10,20"];
+	a -- b	[pos="e,1.5,2 3,4",
+		tail_lp="5,6"];
+}"""
+
+
+def test_connected_components():
+    components = connected_components([*tables, alone], relationships)
+    assert [[t.name for t in c_tables] for c_tables, _ in components] == [
+        ["parent", "child", "exclude"],
+        ["alone"],
+    ]
+    assert components[0][1] == relationships
+    assert components[1][1] == []
+
+
+def test_connected_components_chain():
+    chain = [Table(name=str(i), columns=[]) for i in range(4)]
+    links = [
+        Relation(right_table="0", left_table="3", right_cardinality="1", left_cardinality="*"),
+        Relation(right_table="2", left_table="1", right_cardinality="1", left_cardinality="*"),
+        Relation(right_table="3", left_table="2", right_cardinality="1", left_cardinality="*"),
+    ]
+    assert len(connected_components(chain, links)) == 1
+
+
+def test_translate_layout():
+    translated = translate_layout(laid_out, 100, -10)
+    assert 'bb="100.00,-10.00,200.00,40.00"' in translated
+    assert 'pos="110.00,10.00"' in translated
+    assert 'pos="e,101.50,-8.00 103.00,-6.00"' in translated
+    assert 'tail_lp="105.00,-4.00"' in translated
+    # the html labels are left untouched
+    assert '<TD PORT="pos">pos="1,2"</TD>' in translated
+
+
+def test_pack_layouts():
+    packed = pack_layouts([laid_out, laid_out], 'label="title"')
+    assert packed.startswith('graph {\nlabel="title"\nsubgraph {')
+    assert packed.count("subgraph {") == 2
+    # the rows are about as wide as the packed graph is high
+    assert 'bb="0.00,-50.00,100.00,0.00"' in packed
+    assert 'bb="0.00,-108.00,100.00,-58.00"' in packed
+
+
+def test_layout_components():
+    sources = ["graph { a -- b }", "graph { c }"]
+    layouts = layout_components(sources, ["dot", "neato"], _layout_dot, processes=2)
+    assert len(layouts) == 2
+    assert 'bb="' in layouts[0]
+    assert "c" in layouts[1]
+
+
+def test_intermediary_to_schema_packed():
+    image = intermediary_to_schema(
+        [*tables, alone], relationships, extension="svg", layout_processes=2
+    )
+    assert b"<svg" in image
+    assert b"alone" in image
+    assert b"parent" in image
+
+
+def test_intermediary_to_schema_packed_timeout():
+    image = intermediary_to_schema(
+        [*tables, alone], relationships, extension="svg", layout_processes=2, layout_timeout=30
+    )
+    assert b"alone" in image
+    assert b"parent" in image
+
+
+def test_choose_engine():
+    assert choose_engine(10, 10) == "dot"
+    assert choose_engine(1000, 1000) == "dot"
+    assert choose_engine(500, 2000) == "sfdp"
+    assert choose_engine(5000, 0) == "sfdp"
+
+
+def test_unflatten():
+    hub = Table(name="hub", columns=[])
+    leaves = [Table(name=f"leaf{i}", columns=[]) for i in range(4)]
+    lonely = [Table(name=f"alone{i}", columns=[]) for i in range(5)]
+    links = [
+        Relation(
+            right_table="hub", left_table=leaf.name, right_cardinality="1", left_cardinality="*"
+        )
+        for leaf in leaves
+    ]
+    minlens, chains = unflatten([hub, *leaves, *lonely], links, leaf_length=3, chain_length=3)
+    assert minlens == {0: 2, 1: 3, 2: 4, 3: 2}
+    assert chains == [("alone0", "alone1"), ("alone1", "alone2"), ("alone3", "alone4")]
+
+
+def test_dot_engine_and_unflatten():
+    dot = _intermediary_to_dot([*tables, alone], relationships, engine="sfdp", unflatten=True)
+    assert "graph [overlap=scale];" in dot
+    # the two relations of parent to its leaves are staggered
+    assert "minlen=2" in dot
+    assert "minlen=3" in dot
+    assert "overlap" not in _intermediary_to_dot(tables, relationships, engine="dot")
+
+
+def test_intermediary_to_schema_engine():
+    image = intermediary_to_schema(tables, relationships, extension="svg", engine="auto")
+    assert b"<svg" in image
+    image = intermediary_to_schema(
+        [*tables, alone], relationships, extension="svg", engine="neato", unflatten=True
+    )
+    assert b"alone" in image
+
+
+def test_run_with_timeout():
+    assert run_with_timeout(partial(int, "3"), 10) == 3
+    with pytest.raises(ValueError):
+        run_with_timeout(partial(int, "x"), 10)
+    with pytest.raises(LayoutTimeoutError):
+        run_with_timeout(partial(time.sleep, 10), 0.1)
+
+
+def start_child_and_wait(pid_file):
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    pid_file.write_text(str(child.pid))
+    time.sleep(30)
+
+
+def is_running(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # the killed processes may stay zombies until they are reaped
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_run_with_timeout_kills_the_children(tmp_path):
+    pid_file = tmp_path / "pid"
+    with pytest.raises(LayoutTimeoutError):
+        run_with_timeout(partial(start_child_and_wait, pid_file), 1)
+    pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while is_running(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not is_running(pid)
+
+
+def test_degraded_layouts():
+    layouts = list(degraded_layouts(tables, relationships, "dot"))
+    assert [engine for _, _, _, engine in layouts] == ["dot", "sfdp", "sfdp", "sfdp"]
+    _, keys_only, _, _ = layouts[2]
+    assert [[c.name for c in t.columns] for t in keys_only] == [
+        ["id"],
+        ["id", "parent_id"],
+        ["id", "parent_id"],
+    ]
+    _, tables_only, relations_only, _ = layouts[3]
+    assert all(t.columns == [] for t in tables_only)
+    assert all(r.left_column == r.right_column == "" for r in relations_only)
+    assert len(list(degraded_layouts(tables, relationships, "sfdp"))) == 3
+
+
+def slow_dot(dot_file, engine, extension):
+    if engine == "dot":
+        time.sleep(10)
+    return f"{engine} {extension}".encode()
+
+
+def test_intermediary_to_schema_timeout(monkeypatch, caplog):
+    monkeypatch.setattr(main, "_render_dot", slow_dot)
+    image = intermediary_to_schema(tables, relationships, extension="svg", layout_timeout=0.2)
+    assert image == b"sfdp svg"
+    assert len(caplog.records) == 1
+    assert "dot engine did not finish in 0.2s" in caplog.records[0].getMessage()
+
+
+def slow_render(dot_file, engine, extension):
+    time.sleep(10)
+
+
+def test_intermediary_to_schema_all_timeouts(monkeypatch, caplog):
+    monkeypatch.setattr(main, "_render_dot", slow_render)
+    with pytest.raises(LayoutTimeoutError, match="tables only"):
+        intermediary_to_schema(tables, relationships, extension="svg", layout_timeout=0.1)
+    assert len(caplog.records) == 4
+
+
+def test_intermediary_to_schema_auto_timeouts(monkeypatch, caplog):
+    monkeypatch.setattr(main, "_render_dot", slow_render)
+    # auto chooses sfdp, which is not tried again
+    monkeypatch.setattr("eralchemy.layout.DOT_MAX_NODES", 1)
+    with pytest.raises(LayoutTimeoutError, match="tried the auto engine, sfdp engine with"):
+        intermediary_to_schema(
+            tables, relationships, extension="svg", engine="auto", layout_timeout=0.1
+        )
+    assert len(caplog.records) == 3
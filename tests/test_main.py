@@ -1,9 +1,20 @@
+import contextlib
+import io
+
 import pytest
 from sqlalchemy import Column, String
 from sqlalchemy.orm import declarative_base
 
+from eralchemy.helpers import (
+    NamePatterns,
+    iter_plantuml_convert,
+    neighborhood,
+    plantuml_convert,
+    write_chunks,
+)
 from eralchemy.main import (
     all_to_intermediary,
+    cli,
     filter_resources,
     get_output_mode,
     intermediary_to_dot,
@@ -11,6 +22,10 @@ from eralchemy.main import (
     intermediary_to_mermaid,
     intermediary_to_mermaid_er,
     intermediary_to_schema,
+    render_er,
+    render_intermediary,
+    render_many,
+    switch_output_emitter,
 )
 from tests.common import (
     Base,
@@ -46,6 +61,17 @@ def test_all_to_intermediary_markdown():
     check_intermediary_representation_simple_table(tables, relationships)
 
 
+def test_all_to_intermediary_markdown_iterator():
+    tables, relationships = all_to_intermediary(line for line in markdown.split("\n"))
+    check_intermediary_representation_simple_table(tables, relationships)
+
+
+def test_all_to_intermediary_markdown_stdin(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO(markdown))
+    tables, relationships = all_to_intermediary("-")
+    check_intermediary_representation_simple_table(tables, relationships)
+
+
 def test_all_to_intermediary_fails():
     with pytest.raises(ValueError):
         all_to_intermediary("plop")
@@ -56,6 +82,17 @@ def test_filter_no_include_no_exclude():
     check_filter(actual_tables, actual_relationships)
 
 
+def test_filter_does_not_copy_nor_mutate():
+    actual_tables, actual_relationships = filter_resources(tables, relationships)
+    assert all(a is e for a, e in zip(actual_tables, tables))
+    assert all(a is e for a, e in zip(actual_relationships, relationships))
+
+    actual_tables, _ = filter_resources(tables, relationships, exclude_columns=["id"])
+    assert [len(t.columns) for t in tables] == [2, 2, 2]
+    assert actual_tables[0] is not tables[0]
+    assert actual_tables[0].columns[0] is tables[0].columns[1]
+
+
 @pytest.mark.parametrize(
     "include_tables",
     (
@@ -125,6 +162,121 @@ def test_filter_exclude_columns(exclude_columns):
     check_tables_columns(actual_tables, id_is_included=False)
 
 
+def test_name_patterns():
+    patterns = NamePatterns(["parent", "my-table", "ch.*", "^ex(clude)?$"])
+    assert patterns.literals == {"parent", "my-table"}
+    assert patterns("parent")
+    assert patterns("my-table")
+    assert patterns("child")
+    assert patterns("exclude")
+    assert not patterns("parents")
+    assert not patterns("a_child")
+    assert not NamePatterns([])("parent")
+
+
+@pytest.mark.parametrize(
+    ("focus", "depth", "expected"),
+    (
+        (["child"], 0, ["child"]),
+        (["child"], 1, ["parent", "child"]),
+        (["child"], 2, ["parent", "child", "exclude"]),
+        (["parent"], 1, ["parent", "child", "exclude"]),
+        (["ch.*", "exclude"], 0, ["child", "exclude"]),
+    ),
+)
+def test_filter_focus(focus, depth, expected):
+    actual_tables, actual_relationships = filter_resources(
+        tables, relationships, focus=focus, depth=depth
+    )
+    assert [t.name for t in actual_tables] == expected
+    assert all(r.left_table in expected and r.right_table in expected for r in actual_relationships)
+
+
+def test_filter_negative_depth():
+    with pytest.raises(ValueError):
+        filter_resources(tables, relationships, focus=["child"], depth=-1)
+
+
+def test_filter_focus_errors():
+    with pytest.raises(ValueError, match="no table matches the focus unknown"):
+        filter_resources(tables, relationships, focus=["unknown"], depth=2)
+    with pytest.raises(ValueError, match="depth is only used with focus"):
+        filter_resources(tables, relationships, depth=2)
+
+
+def test_filter_focus_then_exclude():
+    actual_tables, actual_relationships = filter_resources(
+        tables, relationships, exclude_tables=["parent"], focus=["child"], depth=2
+    )
+    assert [t.name for t in actual_tables] == ["child", "exclude"]
+    assert actual_relationships == []
+
+
+def test_neighborhood():
+    assert neighborhood(relationships, ["exclude"], 0) == {"exclude"}
+    assert neighborhood(relationships, ["exclude"], 1) == {"exclude", "parent"}
+    assert neighborhood(relationships, ["exclude"], 5) == {"exclude", "parent", "child"}
+    assert neighborhood([], ["exclude"], 5) == {"exclude"}
+
+
+@pytest.mark.parametrize("title", ("", "title"))
+@pytest.mark.parametrize("intermediary_to_output", switch_output_emitter)
+def test_emitters(intermediary_to_output, title):
+    emit = switch_output_emitter[intermediary_to_output]
+    sink = io.BytesIO()
+    write_chunks(emit(tables, relationships, title), sink, buffer_size=10)
+    assert sink.getvalue() == intermediary_to_output(tables, relationships, title)
+
+
+@pytest.mark.parametrize("mode", ("er", "mermaid", "mermaid_er", "dot", "puml"))
+def test_render_intermediary_to_sink(mode):
+    sink = io.BytesIO()
+    assert render_intermediary(tables, relationships, sink, mode, title="title") is None
+    assert sink.getvalue() == render_intermediary(tables, relationships, None, mode, title="title")
+
+
+def test_iter_plantuml_convert():
+    text = markdown * 100
+    chunks = [text[i : i + 7] for i in range(0, len(text), 7)]
+    assert "".join(iter_plantuml_convert(chunks)) == plantuml_convert(text)
+    assert "".join(iter_plantuml_convert([])) == plantuml_convert("")
+
+
+def test_render_many(tmp_path, monkeypatch):
+    calls = []
+
+    def counting_all_to_intermediary(*args, **kwargs):
+        calls.append(args)
+        return all_to_intermediary(*args, **kwargs)
+
+    modes = {"erd.er": "er", "erd.md": "mermaid", "erd.dot": "dot", "erd.puml": "puml"}
+    monkeypatch.setattr("eralchemy.main.all_to_intermediary", counting_all_to_intermediary)
+    render_many(
+        markdown.splitlines(),
+        [str(tmp_path / name) for name in modes],
+        exclude_tables=["exclude"],
+        title="title",
+    )
+    assert len(calls) == 1
+    for name, mode in modes.items():
+        expected = render_er(
+            markdown.splitlines(), None, mode, exclude_tables=["exclude"], title="title"
+        )
+        assert (tmp_path / name).read_bytes() == expected
+
+
+def test_cli_output_file_with_redirected_stdout(tmp_path):
+    output = tmp_path / "forum.er"
+    with contextlib.redirect_stdout(io.StringIO()):
+        cli(["-i", "example/forum.er", "-o", str(output)])
+    assert output.read_bytes() == render_er("example/forum.er", None, "er")
+
+
+def test_cli_stdout(capsysbinary):
+    cli(["-i", "example/forum.er", "-m", "er"])
+    assert capsysbinary.readouterr().out == render_er("example/forum.er", None, "er")
+
+
 def test_get_output_mode():
     # access .func for partial
     assert get_output_mode("hello.png", "auto").func == intermediary_to_schema
@@ -1,4 +1,4 @@
-from eralchemy.models import Column, sanitize_mermaid
+from eralchemy.models import Column, Table, sanitize_mermaid, set_name_sanitizer
 
 
 def test_mermaid_escape():
@@ -23,3 +23,21 @@ def test_mermaid_er_column_marks_pk_and_fk():
     column = Column(name="association_id", type="UUID", is_key=True, is_foreign_key=True)
     result = column.to_mermaid_er()
     assert result == " UUID association_id PK, FK"
+
+
+def test_set_name_sanitizer():
+    calls = []
+
+    def upper(text, *, is_er=False):
+        calls.append(text)
+        return text.upper()
+
+    set_name_sanitizer(upper)
+    try:
+        table = Table(name="parent", columns=[Column(name="id", type="INTEGER")])
+        for _ in range(3):
+            assert table.to_mermaid_er() == "PARENT {\n INTEGER ID \n}"
+        assert sorted(calls) == ["id", "parent"]
+    finally:
+        set_name_sanitizer()
+    assert table.to_mermaid_er() == "parent {\n INTEGER id \n}"
@@ -0,0 +1,62 @@
+from eralchemy.models import Column, Relation, Table
+from eralchemy.parser import ParserState
+from tests.common import child, exclude_relation, parent, relation, relationships, tables
+
+
+def test_relation_equal_whichever_direction():
+    inverted = Relation(
+        right_table=relation.left_table,
+        right_column=relation.left_column,
+        left_table=relation.right_table,
+        left_column=relation.right_column,
+        right_cardinality=relation.left_cardinality,
+        left_cardinality=relation.right_cardinality,
+    )
+    assert inverted == relation
+    assert inverted.key == relation.key
+    assert hash(inverted) == hash(relation)
+    assert len({relation, inverted, exclude_relation}) == 2
+
+
+def test_table_equal_whichever_columns_order():
+    reordered = Table(name=parent.name, columns=parent.columns[::-1])
+    assert reordered == parent
+    assert hash(reordered) == hash(parent)
+    assert reordered != Table(name=parent.name, columns=parent.columns[:1])
+    assert reordered != Table(name=parent.name, columns=[Column("id"), Column("name")])
+
+
+def test_compare_schemas_with_sets():
+    assert set(tables) - {parent, child} == {tables[2]}
+    assert set(relationships) & {relation} == {relation}
+
+
+def test_keys_are_cached():
+    table = Table(name="parent", columns=[Column("id", is_key=True)])
+    assert table.key is table.key
+    table.columns.append(Column("name"))
+    table.reset_key()
+    assert table.key == (
+        "parent",
+        (("id", None, True, False, False), ("name", None, False, True, False)),
+    )
+    table.name = "renamed"
+    assert table.key[0] == "renamed"
+
+    inverted = Relation("parent", "child", "*", "1")
+    assert inverted.key is inverted.key
+    inverted.left_table = "other"
+    assert "other" in inverted.key
+
+
+def test_parsed_tables_keys_follow_the_columns():
+    state = ParserState()
+    parent = Table(name="parent", columns=[])
+    state.update(parent)
+    parent.key
+    state.update(Column("id", is_key=True))
+    state.update(Column("child_id"))
+    state.update(Relation("parent", "parent", "*", "1", left_column="child_id"))
+    assert parent.key == Table(name="parent", columns=list(parent.columns)).key
+    # the foreign key flag of child_id, the first column by name
+    assert parent.key[1][0][-1] is True
@@ -6,8 +6,10 @@ from eralchemy.parser import (
     DuplicateColumnException,
     DuplicateTableException,
     NoCurrentTableException,
+    ParserState,
     ParsingException,
     RelationNoColException,
+    _parse_lines_parallel,
     line_iterator_to_intermediary,
     parse_line,
     remove_comments_from_line,
@@ -89,6 +91,21 @@ def test_parse_line():
         assert isinstance(rv, Table)
 
 
+@pytest.mark.parametrize(
+    "line, typ",
+    (
+        ("[table]", Table),
+        ('name {label:"a--b"}', Column),
+        ("left *--1 right", Relation),
+        ("[left] *--1 right", Table),
+        ("[table name]", Table),
+        ("*id", Column),
+    ),
+)
+def test_parse_line_dispatch(line, typ):
+    assert isinstance(parse_line(line), typ)
+
+
 def test_update_models_fails_no_current_table():
     for new_obj in (c.relation, c.parent_id):
         with pytest.raises(NoCurrentTableException):
@@ -200,3 +217,61 @@ def test_integration_errors():
     with pytest.raises(ParsingException):
         line_iterator_to_intermediary(markdown_broken.split("\n"))
     # TODO check error
+
+
+def test_parser_state_updates_in_place():
+    state = ParserState()
+    tables = state.tables
+    for line in filter(None, (line.strip() for line in c.markdown.split("\n"))):
+        state.update(parse_line(line))
+    assert state.tables is tables
+    c.assert_lst_equal(state.tables, c.tables)
+    c.assert_lst_equal(state.relations, c.relationships)
+    child = next(t for t in state.tables if t.name == "child")
+    assert [col.is_foreign_key for col in child.columns] == [False, True]
+    with pytest.raises(DuplicateColumnException):
+        state.update(Column(name="parent_id"))
+
+
+def test_integration_parser_parallel():
+    tables, relations = line_iterator_to_intermediary(
+        c.markdown.split("\n"), processes=2, chunk_size=2
+    )
+    assert tables == c.tables
+    assert relations == [c.relation, c.exclude_relation]
+    assert [col.is_foreign_key for col in tables[1].columns] == [False, True]
+
+
+def test_parse_lines_parallel_reads_lazily():
+    read = []
+
+    def lines():
+        for i in range(1000):
+            read.append(i)
+            yield f"[table_{i}]"
+            yield "*id"
+
+    parsed_lines = _parse_lines_parallel(lines(), processes=2, chunk_size=10)
+    line_nb, _, table = next(parsed_lines)
+    assert (line_nb, table) == (0, Table("table_0", []))
+    # only the chunks in flight have been read
+    assert len(read) < 100
+    assert len(list(parsed_lines)) == 1999
+
+
+def test_integration_errors_parallel():
+    markdown_broken = """
+        [parent]
+            *id {label:"INTEGER"}
+        child *--? parent
+        [child]
+            *id {label:"INTEGER"}
+            *id {label:"INTEGER"}
+        [parent]
+        """
+    with pytest.raises(ParsingException) as serial:
+        line_iterator_to_intermediary(markdown_broken.split("\n"))
+    with pytest.raises(ParsingException) as parallel:
+        line_iterator_to_intermediary(markdown_broken.split("\n"), processes=2, chunk_size=1)
+    assert "Error on line 3" in str(serial.value)
+    assert str(parallel.value) == str(serial.value)
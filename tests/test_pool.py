@@ -0,0 +1,96 @@
+import shutil
+import subprocess
+import threading
+
+import pytest
+
+from eralchemy import RenderPool, main, pool, render_er
+from eralchemy.main import _intermediary_to_dot, _render_dot, intermediary_to_schema
+from tests.common import Base, relationships, tables
+
+
+def test_render_pool():
+    dot_file = _intermediary_to_dot(tables, relationships)
+    with RenderPool(processes=2) as pool:
+        futures = [pool.submit(dot_file, "dot", "svg") for _ in range(4)]
+        images = [future.result() for future in futures]
+    assert images == [_render_dot(dot_file, "dot", "svg")] * 4
+
+
+def test_render_pool_bounded():
+    with RenderPool(processes=1, max_pending=1) as pool:
+        first = pool.submit("graph {}", "dot", "svg")
+        # the second render waits for a free slot
+        submitted = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (pool.submit("graph {}", "dot", "svg").result(), submitted.set())
+        )
+        thread.start()
+        first.result()
+        thread.join()
+    assert submitted.is_set()
+
+
+def test_render_pool_error():
+    with RenderPool(processes=1) as pool, pytest.raises(Exception):
+        pool.render("graph {", "dot", "svg")
+
+
+def test_intermediary_to_schema_render_pool():
+    with RenderPool(processes=1) as pool:
+        image = intermediary_to_schema(tables, relationships, extension="svg", render_pool=pool)
+    assert image == intermediary_to_schema(tables, relationships, extension="svg")
+
+
+def test_render_er_render_pool(tmp_path):
+    with RenderPool(processes=1) as pool:
+        for name in ("first", "second"):
+            render_er(Base, str(tmp_path / f"{name}.svg"), render_pool=pool)
+    assert (tmp_path / "first.svg").read_bytes() == (tmp_path / "second.svg").read_bytes()
+
+
+needs_dot = pytest.mark.skipif(shutil.which("dot") is None, reason="needs the dot program")
+
+
+@needs_dot
+@pytest.mark.parametrize("extension", ("svg", "png"))
+def test_dot_process(extension):
+    graphviz = pytest.importorskip("graphviz")
+    dot_file = _intermediary_to_dot(tables, relationships)
+    process = pool.DotProcess("dot", extension)
+    try:
+        images = [process.render(dot_file), process.render("graph { a }")]
+    finally:
+        process.close()
+    assert images[0] == graphviz.Source(dot_file).pipe(format=extension)
+    assert images[1] == graphviz.Source("graph { a }").pipe(format=extension)
+
+
+@needs_dot
+def test_render_with_dot_process(monkeypatch):
+    graphviz = pytest.importorskip("graphviz")
+    monkeypatch.setattr(main, "_graphviz", lambda: graphviz)
+    monkeypatch.setattr(pool, "_dot_processes", {})
+    with pytest.raises(subprocess.CalledProcessError):
+        pool._render("graph {", "dot", "svg")
+    # the process stopped by the error is started again
+    assert pool._render("graph { a }", "dot", "svg") == graphviz.Source("graph { a }").pipe(
+        format="svg"
+    )
+    assert list(pool._dot_processes) == [("dot", "svg")]
+    pool._dot_processes["dot", "svg"].close()
+
+
+@needs_dot
+def test_dot_process_errors(monkeypatch):
+    graphviz = pytest.importorskip("graphviz")
+    monkeypatch.setattr(main, "_graphviz", lambda: graphviz)
+    monkeypatch.setattr(pool, "_dot_processes", {})
+    invalid = "graph {\na -- }"
+    expected = subprocess.run(["dot", "-Tsvg"], input=invalid.encode(), capture_output=True).stderr
+    # the warnings of the previous render are not in the stderr of the error
+    pool._render("graph { a [shape=unknown] }", "dot", "svg")
+    for _ in range(2):
+        with pytest.raises(subprocess.CalledProcessError) as error:
+            pool._render(invalid, "dot", "svg")
+        assert error.value.stderr == expected
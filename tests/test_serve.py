@@ -0,0 +1,181 @@
+import http.client
+import os
+import socket
+import threading
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from eralchemy.main import render_er
+from eralchemy.serve import (
+    RenderServer,
+    UnknownInputError,
+    load_inputs,
+    make_server,
+    parse_options,
+)
+from eralchemy.sqla import _inspected_fingerprint, database_fingerprint
+from tests.common import markdown
+
+
+@pytest.fixture
+def schema(tmp_path):
+    filename = tmp_path / "schema.er"
+    filename.write_text(markdown)
+    return filename
+
+
+@pytest.fixture
+def server(schema):
+    server = make_server("127.0.0.1:0", RenderServer({"schema": {"input": str(schema)}}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path, headers=None):
+    host, port = server.server_address
+    connection = http.client.HTTPConnection(host, port)
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    return response.status, dict(response.getheaders()), response.read()
+
+
+def test_parse_options():
+    assert parse_options("focus=parent,child&focus=exclude&depth=2&unflatten=true") == {
+        "focus": ["parent", "child", "exclude"],
+        "depth": 2,
+        "unflatten": True,
+    }
+    with pytest.raises(ValueError, match="Unknown option 'color'"):
+        parse_options("color=red")
+
+
+def test_load_inputs(tmp_path):
+    filename = tmp_path / "inputs.toml"
+    filename.write_text('[inputs.shop]\ninput = "sqlite:///shop.db"\nschema = "main"\n')
+    assert load_inputs(filename) == {"shop": {"input": "sqlite:///shop.db", "schema": "main"}}
+    filename.write_text('[inputs.shop]\nuri = "sqlite:///shop.db"\n')
+    with pytest.raises(ValueError, match="shop has no input"):
+        load_inputs(filename)
+
+
+def test_render_server_caches(tmp_path, schema):
+    render_server = RenderServer({"schema": {"input": str(schema)}}, check_interval=0)
+    etag, content = render_server.render("schema", "er", {"focus": ["parent"]})
+    render_er(str(schema), str(tmp_path / "expected.er"), focus=["parent"])
+    assert content == (tmp_path / "expected.er").read_bytes()
+    assert render_server.render("schema", "er", {"focus": ["parent"]}) == (etag, content)
+    assert render_server.render("schema", "md", {"focus": ["parent"]})[1] != content
+    assert (render_server.introspections, render_server.renders) == (1, 2)
+
+    schema.write_text(markdown.replace("name {", "title {"))
+    os.utime(schema, ns=(0, 0))
+    new_etag, new_content = render_server.render("schema", "er", {"focus": ["parent"]})
+    assert new_etag != etag
+    assert b"title" in new_content
+    assert (render_server.introspections, render_server.renders) == (2, 3)
+
+    with pytest.raises(UnknownInputError):
+        render_server.render("other", "er", {})
+
+
+def test_render_server_check_interval(schema):
+    render_server = RenderServer({"schema": {"input": str(schema)}}, check_interval=3600)
+    render_server.render("schema", "er", {})
+    schema.write_text(markdown.replace("name {", "title {"))
+    render_server.render("schema", "er", {})
+    assert render_server.introspections == 1
+
+
+def test_database_fingerprint(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'shop.db'}")
+    fingerprint = database_fingerprint(engine)
+    assert database_fingerprint(engine) == fingerprint
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY)"))
+    assert database_fingerprint(engine) != fingerprint
+
+
+def test_inspected_fingerprint_primary_key(tmp_path):
+    fingerprints = []
+    for primary_key in ("id", "name"):
+        engine = create_engine(f"sqlite:///{tmp_path / f'{primary_key}.db'}")
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE orders (id INTEGER NOT NULL, name TEXT NOT NULL,"
+                    f" PRIMARY KEY ({primary_key}))"
+                )
+            )
+        fingerprints.append(_inspected_fingerprint(inspect(engine)))
+    assert fingerprints[0] != fingerprints[1]
+
+
+def test_render_server_database(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'shop.db'}"
+    with create_engine(uri).begin() as connection:
+        connection.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY)"))
+    render_server = RenderServer({"shop": {"input": uri}}, check_interval=0)
+    assert b"[orders]" in render_server.render("shop", "er", {})[1]
+    render_server.render("shop", "er", {})
+    assert render_server.introspections == 1
+    with create_engine(uri).begin() as connection:
+        connection.execute(text("CREATE TABLE customers (id INTEGER PRIMARY KEY)"))
+    assert b"[customers]" in render_server.render("shop", "er", {})[1]
+    assert render_server.introspections == 2
+
+
+def test_serve_http(server):
+    status, headers, content = get(server, "/schema.er?exclude_tables=exclude")
+    assert status == 200
+    assert headers["Content-Type"] == "text/plain; charset=utf-8"
+    assert b"[parent]" in content and b"[exclude]" not in content
+
+    status, headers, content = get(
+        server, "/schema.er?exclude_tables=exclude", {"If-None-Match": headers["ETag"]}
+    )
+    assert status == 304
+    assert content == b""
+
+    status, headers, content = get(server, "/schema.svg")
+    assert status == 200
+    assert headers["Content-Type"] == "image/svg+xml"
+    assert content.startswith(b"<?xml")
+
+
+@pytest.mark.parametrize(
+    ("path", "status"),
+    [("/other.er", 404), ("/schema.er?color=red", 400), ("/schema.er?mode=unknown", 400)],
+)
+def test_serve_http_errors(server, path, status):
+    assert get(server, path)[0] == status
+
+
+def test_serve_unix_socket(tmp_path, schema):
+    address = str(tmp_path / "eralchemy.sock")
+    server = make_server(address, RenderServer({"schema": {"input": str(schema)}}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(address)
+            client.sendall(b"GET /schema.md HTTP/1.0\r\n\r\n")
+            response = b"".join(iter(lambda: client.recv(65536), b""))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert response.startswith(b"HTTP/1.0 200")
+    assert b"classDiagram" in response
+
+
+def test_server_unexpected_error(server, monkeypatch, caplog):
+    def failing_render(*args):
+        raise RuntimeError("the database is down")
+
+    monkeypatch.setattr(server.render_server, "render", failing_render)
+    status, _, _ = get(server, "/schema.svg")
+    assert status == 500
+    assert "rendering /schema.svg failed" in caplog.text
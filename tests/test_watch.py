@@ -0,0 +1,65 @@
+import pytest
+
+from eralchemy.parser import ParsingException, line_iterator_to_intermediary
+from eralchemy.watch import IncrementalParser, split_blocks, watch
+from tests import common as c
+
+
+def test_split_blocks():
+    lines = ["# comment", "[parent]", "*id", "  [child]", "*id", "child *--1 parent"]
+    assert list(split_blocks(lines)) == [
+        (0, ("# comment",)),
+        (1, ("[parent]", "*id")),
+        (3, ("  [child]", "*id", "child *--1 parent")),
+    ]
+
+
+def test_incremental_parser_reparses_changed_blocks():
+    parser = IncrementalParser()
+    lines = c.markdown.split("\n")
+    tables, relations = parser.parse(lines)
+    assert parser.parsed_blocks == 4
+    assert (tables, relations) == line_iterator_to_intermediary(lines)
+
+    lines = [line.replace("name {", "title {") for line in lines]
+    tables, relations = parser.parse(lines)
+    assert parser.parsed_blocks == 5
+    assert (tables, relations) == line_iterator_to_intermediary(lines)
+    assert [col.name for col in tables[0].columns] == ["id", "title"]
+    assert [col.is_foreign_key for col in tables[1].columns] == [False, True]
+
+
+def test_incremental_parser_errors():
+    parser = IncrementalParser()
+    lines = c.markdown.split("\n")
+    parser.parse(lines)
+    lines.insert(7, "*id")
+    with pytest.raises(ParsingException) as incremental:
+        parser.parse(lines)
+    with pytest.raises(ParsingException) as serial:
+        line_iterator_to_intermediary(lines)
+    assert str(incremental.value) == str(serial.value)
+
+
+def test_watch_survives_errors(tmp_path, monkeypatch, capsys):
+    input = tmp_path / "schema.er"
+    output = tmp_path / "schema.dot"
+    input.write_text(c.markdown)
+
+    def save_by_replacing():
+        # the file is missing for a poll, then the output cannot be written
+        input.unlink()
+        yield
+        input.write_text(c.markdown + "\n[other]\n*id\n")
+        output.unlink()
+        output.mkdir()
+        yield
+        raise KeyboardInterrupt
+
+    steps = save_by_replacing()
+    monkeypatch.setattr("eralchemy.watch.time.sleep", lambda _: next(steps))
+    watch(str(input), str(output))
+    lines = capsys.readouterr().err.splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith(f"rendered {output}")
+    assert lines[1].startswith("rendering failed:")